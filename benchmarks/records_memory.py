@@ -0,0 +1,106 @@
+"""
+Memory benchmark of in-flight submissions.
+
+Compares memory held by asyncpraw submission models against compact
+submission records for a burst of synthetic listing children, and reports
+bytes per in-flight post.
+
+Usage: python -m benchmarks.records_memory [--posts 100] [--selftext 20000]
+"""
+import argparse
+import asyncio
+import gc
+import json
+import random
+import string
+import tracemalloc
+import asyncpraw
+
+from bot.utils.records import SubmissionRecord
+
+
+def make_child(index: int, selftext_size: int) -> dict:
+    media_ids = [f'media{index}_{i}' for i in range(5)]
+    words = ''.join(random.choices(string.ascii_letters + ' ', k=selftext_size))
+    return {
+        'kind': 't3',
+        'data': {
+            'id': f'post{index}',
+            'name': f't3_post{index}',
+            'subreddit': 'benchmark',
+            'subreddit_id': 't5_bench',
+            'author': f'user{index}',
+            'author_fullname': f't2_user{index}',
+            'permalink': f'/r/benchmark/comments/post{index}/title/',
+            'title': f'Benchmark submission #{index}',
+            'link_flair_text': 'Discussion',
+            'selftext': words,
+            'selftext_html': f'<div class="md"><p>{words}</p></div>',
+            'url': f'https://www.reddit.com/gallery/post{index}',
+            'spoiler': False,
+            'over_18': False,
+            'created_utc': 1700000000.0 + index,
+            'score': 1,
+            'num_comments': 0,
+            'secure_media': None,
+            'gallery_data': {'items': [{'media_id': media_id, 'id': i} for i, media_id in enumerate(media_ids)]},
+            'media_metadata': {
+                media_id: {
+                    'status': 'valid',
+                    'e': 'Image',
+                    'm': 'image/jpg',
+                    's': {'u': f'https://i.redd.it/{media_id}.jpg', 'x': 1920, 'y': 1080},
+                    'p': [{'u': f'https://preview.redd.it/{media_id}.jpg?width={w}', 'x': w, 'y': w} for w in (108, 216, 320, 640, 960)]
+                }
+                for media_id in media_ids
+            },
+            'preview': {'enabled': False, 'images': []},
+            'all_awardings': [],
+            'awarders': [],
+            'treatment_tags': []
+        }
+    }
+
+
+def measure(build) -> int:
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    held = build()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del held
+    return after - before
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--posts', type=int, default=100, help='count of in-flight posts')
+    parser.add_argument('--selftext', type=int, default=20000, help='selftext size of every post')
+    parser.add_argument('--text-limit', type=int, default=1000, help='configured text limit')
+    args = parser.parse_args()
+
+    reddit = asyncpraw.Reddit(client_id='benchmark', client_secret='benchmark', user_agent='disreddit benchmark')
+    # Response body is parsed inside of measurement, as the feeder does for every poll
+    body = json.dumps({'kind': 'Listing', 'data': {'children': [make_child(i, args.selftext) for i in range(args.posts)]}})
+
+    def build_models():
+        return list(reddit._objector.objectify(data=json.loads(body)))
+
+    def build_records():
+        return [SubmissionRecord.from_submission(sm, args.text_limit) for sm in reddit._objector.objectify(data=json.loads(body))]
+
+    models_bytes = measure(build_models)
+    records_bytes = measure(build_records)
+
+    print(f'Posts: {args.posts}, selftext: {args.selftext} characters, text limit: {args.text_limit}')
+    print(f'asyncpraw models:    {models_bytes / args.posts:>10.0f} bytes per post')
+    print(f'submission records:  {records_bytes / args.posts:>10.0f} bytes per post')
+    print(f'Reduction: {(1 - records_bytes / models_bytes):.1%}')
+
+    asyncio.get_event_loop().run_until_complete(reddit.close())
+
+
+if __name__ == '__main__':
+    main()
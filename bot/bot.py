@@ -1,22 +1,113 @@
 import logging
 from datetime import datetime
+from typing import Optional
 from databases import Database
 import asyncpraw
 import disnake
 from disnake.ext import commands
 
-from bot.utils import RedditFeed
+from bot.utils import ActivityRecorder, BotStatistics, Config, RedditFeed, StartupPipeline, SubmissionArchive
+
+# Database schema migrations, applied in order and tracked by SQLite user_version
+MIGRATIONS = (
+    # 1: Feeds (created without migrations before, so only if not exists)
+    (
+        '''
+        CREATE TABLE IF NOT EXISTS "feeds" (
+            "guild_id" INTEGER NOT NULL,
+            "channel_id" INTEGER NOT NULL,
+            "subreddit" TEXT NOT NULL
+        )
+        ''',
+    ),
+    # 2: Feed checkpoints
+    (
+        '''
+        CREATE TABLE IF NOT EXISTS "checkpoints" (
+            "channel_id" INTEGER NOT NULL,
+            "subreddit" TEXT NOT NULL,
+            "created_utc" REAL NOT NULL,
+            PRIMARY KEY ("channel_id", "subreddit")
+        )
+        ''',
+    ),
+    # 3: Feed kinds (new/hot/rising/top) with rank and score thresholds
+    (
+        'ALTER TABLE "feeds" ADD COLUMN "kind" TEXT NOT NULL DEFAULT \'new\'',
+        'ALTER TABLE "feeds" ADD COLUMN "max_rank" INTEGER',
+        'ALTER TABLE "feeds" ADD COLUMN "min_score" INTEGER'
+    ),
+    # 4: Per-minute feed activity counters with hourly and daily rollups
+    tuple(
+        f'''
+        CREATE TABLE IF NOT EXISTS "{table}" (
+            "ts" INTEGER NOT NULL,
+            "channel_id" INTEGER NOT NULL,
+            "subreddit" TEXT NOT NULL,
+            "seen" INTEGER NOT NULL,
+            "delivered" INTEGER NOT NULL,
+            "errors" INTEGER NOT NULL,
+            "reddit_calls" INTEGER NOT NULL,
+            "latency_p50" REAL,
+            "latency_p95" REAL,
+            "latency_p99" REAL,
+            PRIMARY KEY ("ts", "channel_id", "subreddit")
+        )
+        '''
+        for table in ('activity_minute', 'activity_hourly', 'activity_daily')
+    ),
+    # 5: Archive of delivered submissions with full-text index
+    (
+        '''
+        CREATE TABLE IF NOT EXISTS "archive" (
+            "id" INTEGER PRIMARY KEY,
+            "submission_id" TEXT NOT NULL,
+            "subreddit" TEXT NOT NULL,
+            "title" TEXT NOT NULL,
+            "flair" TEXT NOT NULL,
+            "author" TEXT NOT NULL,
+            "permalink" TEXT NOT NULL,
+            "url" TEXT NOT NULL,
+            "created_utc" REAL NOT NULL,
+            "delivered_at" REAL NOT NULL,
+            "channel_id" INTEGER NOT NULL,
+            "guild_id" INTEGER NOT NULL
+        )
+        ''',
+        'CREATE INDEX IF NOT EXISTS "archive_delivered_at" ON "archive" ("delivered_at")',
+        '''
+        CREATE VIRTUAL TABLE IF NOT EXISTS "archive_fts" USING fts5(
+            "title", "flair", "author", "subreddit",
+            content="archive", content_rowid="id", tokenize="unicode61 remove_diacritics 2"
+        )
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS "archive_insert" AFTER INSERT ON "archive" BEGIN
+            INSERT INTO "archive_fts" (rowid, "title", "flair", "author", "subreddit")
+            VALUES (new."id", new."title", new."flair", new."author", new."subreddit");
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS "archive_delete" AFTER DELETE ON "archive" BEGIN
+            INSERT INTO "archive_fts" ("archive_fts", rowid, "title", "flair", "author", "subreddit")
+            VALUES ('delete', old."id", old."title", old."flair", old."author", old."subreddit");
+        END
+        '''
+    )
+)
 
 
 class DisredditBot(commands.Bot):
-    def __init__(self, database_path: str, *args, **kwargs):
+    def __init__(self, config: Config, startup: Optional[StartupPipeline] = None, *args, **kwargs):
         self.log = logging.getLogger('Disreddit')
         self.start_time = datetime.now()
-        self.database = Database('sqlite:///{0}'.format(database_path))
-        self.config = {
-            'text_limit': 1000,
-            'feeders_limit': 5
-        }
+        self.startup = startup or StartupPipeline()
+        self.startup.done('config')
+        self.config = config
+        self.database = Database('sqlite:///{0}'.format(self.config['bot']['sqlite-path']))
+        self.stats = BotStatistics()
+        self.activity = ActivityRecorder(self)
+        self.archive = SubmissionArchive(self)
         self.feeder = RedditFeed(self)
 
         self.log.info('Starting disnake {0} {1} with asyncpraw {2}...'.format(
@@ -55,11 +146,40 @@ class DisredditBot(commands.Bot):
         )
 
     async def database_connect(self) -> None:
-        await self.database.connect()
-        await self.database.execute('''
-        CREATE TABLE IF NOT EXISTS "feeds" (
-            "guild_id" INTEGER NOT NULL,
-            "channel_id" INTEGER NOT NULL,
-            "subreddit" TEXT NOT NULL
-        )
-        ''')
+        with self.startup.phase('database'):
+            await self.database.connect()
+            await self.database_migrate()
+        self.activity.start()
+        self.archive.start()
+        self.feeder.checkpoints.start()
+
+    async def database_migrate(self) -> None:
+        """Applies database schema migrations newer than SQLite ``user_version``."""
+        version = await self.database.fetch_val('PRAGMA user_version')
+        for number, statements in enumerate(MIGRATIONS[version:], start=version + 1):
+            async with self.database.transaction():
+                for statement in statements:
+                    await self.database.execute(statement)
+                await self.database.execute(f'PRAGMA user_version = {number}')
+            self.log.info(f'Applied database migration {number}')
+
+    async def start(self, *args, **kwargs) -> None:
+        with self.startup.phase('reddit'):
+            await self.feeder.connect()
+        self.startup.begin('gateway')
+        await super().start(*args, **kwargs)
+
+    async def _sync_application_commands(self) -> None:
+        # Timing the first command sync, which runs along with feeds restore
+        self.startup.begin('commands')
+        await super()._sync_application_commands()
+        self.startup.done('commands')
+
+    async def close(self) -> None:
+        # Stopping feeds before closing the connection, so remaining messages can be sent
+        await self.feeder.shutdown(self.config['feeds']['shutdown-timeout'])
+        if self.database.is_connected:
+            await self.activity.close()
+            await self.archive.close()
+            await self.database.disconnect()
+        await super().close()
@@ -2,7 +2,12 @@ import logging
 from datetime import datetime
 
 from . import exceptions
+from .activity import ActivityRecorder
+from .archive import SubmissionArchive
+from .config import Config
 from .redditfeed import RedditFeed
+from .stats import BotStatistics
+from .startup import StartupPipeline
 
 
 class LogFormatter(logging.Formatter):
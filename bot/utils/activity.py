@@ -0,0 +1,301 @@
+import logging
+import random
+import time
+import asyncio
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+log = logging.getLogger(__name__)
+
+# Feed key of global counters
+GLOBAL = (0, '')
+
+# Maximum count of latency samples kept per minute and feed
+LATENCY_SAMPLES = 500
+
+# Rollup tables and their bucket sizes in seconds
+ROLLUPS = (
+    ('activity_hourly', 'activity_minute', 3600),
+    ('activity_daily', 'activity_hourly', 86400)
+)
+
+
+def _quantile(samples: List[float], q: float) -> float:
+    # Nearest-rank quantile of sorted samples
+    return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+
+class ActivityBucket:
+    """Counters of one feed (or globally) in one minute."""
+
+    __slots__ = ('seen', 'delivered', 'errors', 'reddit_calls', 'latencies', 'latency_count')
+
+    def __init__(self):
+        self.seen = 0
+        self.delivered = 0
+        self.errors = 0
+        self.reddit_calls = 0
+        self.latencies: List[float] = []
+        self.latency_count = 0
+
+    def add_latency(self, latency: float) -> None:
+        # Reservoir sampling keeps quantiles of busy minutes with bounded memory
+        self.latency_count += 1
+        if len(self.latencies) < LATENCY_SAMPLES:
+            self.latencies.append(latency)
+            return
+        index = random.randrange(self.latency_count)
+        if index < LATENCY_SAMPLES:
+            self.latencies[index] = latency
+
+    def row(self) -> Dict[str, Any]:
+        row = {
+            'seen': self.seen,
+            'delivered': self.delivered,
+            'errors': self.errors,
+            'reddit_calls': self.reddit_calls,
+            'latency_p50': None,
+            'latency_p95': None,
+            'latency_p99': None
+        }
+        if self.latencies:
+            latencies = sorted(self.latencies)
+            row['latency_p50'] = _quantile(latencies, 0.50)
+            row['latency_p95'] = _quantile(latencies, 0.95)
+            row['latency_p99'] = _quantile(latencies, 0.99)
+        return row
+
+
+class ActivityRecorder:
+    """Per-minute counters of feed activity, written to database by buffered writer.
+
+    Counters are kept per feed (channel ID and subreddit name) and globally. Finished
+    minutes are written every ``activity.flush-interval`` seconds, then rolled up into
+    hourly and daily tables and expired by retention. Latency is seconds from submission
+    creation to delivery. Rolled up p50 is the delivery-weighted mean of minute p50,
+    p95 and p99 are the maximum of minute values, so they are approximate.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self._buckets: Dict[Tuple[int, Tuple[int, str]], ActivityBucket] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def config(self) -> Dict[str, Any]:
+        return self.bot.config['activity']
+
+    def _bucket(self, feed: Tuple[int, str]) -> ActivityBucket:
+        key = (int(time.time()) // 60 * 60, feed)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = ActivityBucket()
+        return bucket
+
+    def _feeds(self, channel_id: Optional[int], subreddit: Optional[str]) -> Tuple[Tuple[int, str], ...]:
+        if channel_id is None or subreddit is None:
+            return (GLOBAL,)
+        return (GLOBAL, (channel_id, subreddit))
+
+    def seen(self, channel_id: int, subreddit: str) -> None:
+        """
+        Counts submission seen by feed.
+
+        Parameters
+        ----------
+        channel_id: :class:`int`
+            The feed's target Channel ID.
+        subreddit: :class:`str`
+            The feed's Subreddit display name.
+        """
+        for feed in self._feeds(channel_id, subreddit):
+            self._bucket(feed).seen += 1
+
+    def delivered(self, channel_id: int, subreddit: str, created_utc: float) -> None:
+        """
+        Counts submission delivered by feed and its latency.
+
+        Parameters
+        ----------
+        channel_id: :class:`int`
+            The feed's target Channel ID.
+        subreddit: :class:`str`
+            The feed's Subreddit display name.
+        created_utc: :class:`float`
+            The creation time of delivered submission.
+        """
+        latency = max(0.0, time.time() - created_utc)
+        for feed in self._feeds(channel_id, subreddit):
+            bucket = self._bucket(feed)
+            bucket.delivered += 1
+            bucket.add_latency(latency)
+
+    def send_error(self, channel_id: int, subreddit: Optional[str] = None) -> None:
+        """
+        Counts failed message send.
+
+        Parameters
+        ----------
+        channel_id: :class:`int`
+            The target Channel ID.
+        subreddit: Optional[:class:`str`]
+            The feed's Subreddit display name, counted only globally if not given.
+        """
+        for feed in self._feeds(channel_id, subreddit):
+            self._bucket(feed).errors += 1
+
+    def reddit_call(self, channel_id: Optional[int] = None, subreddit: Optional[str] = None) -> None:
+        """
+        Counts Reddit API request.
+
+        Parameters
+        ----------
+        channel_id: Optional[:class:`int`]
+            The feed's target Channel ID, counted only globally if not given.
+        subreddit: Optional[:class:`str`]
+            The feed's Subreddit display name, counted only globally if not given.
+        """
+        for feed in self._feeds(channel_id, subreddit):
+            self._bucket(feed).reddit_calls += 1
+
+    def start(self) -> None:
+        """Starts buffered writer, must be called after database is connected."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name='ActivityRecorder')
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.config['flush-interval'])
+            try:
+                await self.flush()
+                await self.rollup()
+            except Exception:
+                log.exception('Failed to write activity counters')
+
+    async def close(self) -> None:
+        """Stops buffered writer and writes all counters, including the current minute."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        try:
+            await self.flush(everything=True)
+            await self.rollup()
+        except Exception:
+            log.exception('Failed to write activity counters')
+
+    async def flush(self, everything: bool = False) -> int:
+        """
+        Writes counters of finished minutes to database and returns count of written rows.
+
+        Parameters
+        ----------
+        everything: :class:`bool`
+            Whether to write the current minute too.
+        """
+        current = int(time.time()) // 60 * 60
+        keys = [key for key in self._buckets if everything or key[0] < current]
+        if not keys:
+            return 0
+
+        rows = []
+        for key in keys:
+            (ts, (channel_id, subreddit)) = key
+            rows.append({'ts': ts, 'channel_id': channel_id, 'subreddit': subreddit, **self._buckets.pop(key).row()})
+
+        # Minute written on shutdown may be continued after restart, so counters are summed
+        await self.bot.database.execute_many(
+            'INSERT INTO activity_minute '
+            '(ts, channel_id, subreddit, seen, delivered, errors, reddit_calls, latency_p50, latency_p95, latency_p99) '
+            'VALUES (:ts, :channel_id, :subreddit, :seen, :delivered, :errors, :reddit_calls, '
+            ':latency_p50, :latency_p95, :latency_p99) '
+            'ON CONFLICT (ts, channel_id, subreddit) DO UPDATE SET '
+            'seen = seen + excluded.seen, '
+            'delivered = delivered + excluded.delivered, '
+            'errors = errors + excluded.errors, '
+            'reddit_calls = reddit_calls + excluded.reddit_calls, '
+            'latency_p50 = COALESCE(excluded.latency_p50, latency_p50), '
+            'latency_p95 = MAX(COALESCE(excluded.latency_p95, latency_p95), COALESCE(latency_p95, excluded.latency_p95)), '
+            'latency_p99 = MAX(COALESCE(excluded.latency_p99, latency_p99), COALESCE(latency_p99, excluded.latency_p99))',
+            rows
+        )
+        return len(rows)
+
+    async def rollup(self) -> None:
+        """Recomputes hourly and daily rollups of the last two buckets and expires old rows."""
+        now = int(time.time())
+        for table, source, size in ROLLUPS:
+            await self.bot.database.execute(
+                f'INSERT OR REPLACE INTO {table} '
+                '(ts, channel_id, subreddit, seen, delivered, errors, reddit_calls, latency_p50, latency_p95, latency_p99) '
+                f'SELECT ts / {size} * {size}, channel_id, subreddit, '
+                'SUM(seen), SUM(delivered), SUM(errors), SUM(reddit_calls), '
+                'SUM(latency_p50 * delivered) / NULLIF(SUM(CASE WHEN latency_p50 IS NULL THEN 0 ELSE delivered END), 0), '
+                'MAX(latency_p95), MAX(latency_p99) '
+                f'FROM {source} WHERE ts >= :since '
+                f'GROUP BY ts / {size}, channel_id, subreddit',
+                {'since': (now // size - 1) * size}
+            )
+
+        for table, retention in (
+            ('activity_minute', self.config['minute-retention']),
+            ('activity_hourly', self.config['hourly-retention']),
+            ('activity_daily', self.config['daily-retention'])
+        ):
+            await self.bot.database.execute(
+                f'DELETE FROM {table} WHERE ts < :until',
+                {'until': now - retention}
+            )
+
+    async def trend(self, period: str) -> List[Dict[str, Any]]:
+        """
+        Returns global rollup rows of the last day (hourly) or week (daily), oldest first.
+
+        Buckets without activity are returned with zero counters.
+
+        Parameters
+        ----------
+        period: :class:`str`
+            The trend period, ``day`` or ``week``.
+        """
+        table, size, count = ('activity_hourly', 3600, 24) if period == 'day' else ('activity_daily', 86400, 7)
+        since = (int(time.time()) // size - count + 1) * size
+        rows = await self.bot.database.fetch_all(
+            f'SELECT ts, seen, delivered, errors, reddit_calls, latency_p50, latency_p95, latency_p99 FROM {table} '
+            'WHERE channel_id = 0 AND subreddit = \'\' AND ts >= :since ORDER BY ts',
+            {'since': since}
+        )
+        by_ts = {row._mapping['ts']: dict(row._mapping) for row in rows}
+        empty = {
+            'seen': 0, 'delivered': 0, 'errors': 0, 'reddit_calls': 0,
+            'latency_p50': None, 'latency_p95': None, 'latency_p99': None
+        }
+        return [by_ts.get(ts, {'ts': ts, **empty}) for ts in range(since, since + count * size, size)]
+
+    async def top_feeds(self, period: str, limit: int = 5) -> List[Dict[str, Any]]:
+        """
+        Returns feeds with the most delivered submissions over the last day or week.
+
+        Parameters
+        ----------
+        period: :class:`str`
+            The trend period, ``day`` or ``week``.
+        limit: :class:`int`
+            The maximum count of returned feeds.
+        """
+        table, size, count = ('activity_hourly', 3600, 24) if period == 'day' else ('activity_daily', 86400, 7)
+        rows = await self.bot.database.fetch_all(
+            f'SELECT channel_id, subreddit, SUM(seen) AS seen, SUM(delivered) AS delivered, SUM(errors) AS errors '
+            f'FROM {table} WHERE channel_id != 0 AND ts >= :since '
+            'GROUP BY channel_id, subreddit ORDER BY delivered DESC LIMIT :limit',
+            {'since': (int(time.time()) // size - count + 1) * size, 'limit': limit}
+        )
+        return [dict(row._mapping) for row in rows]
+
+
+def sparkline(values: Iterable[float]) -> str:
+    """Renders values as a line of block characters."""
+    values = list(values)
+    if not values:
+        return ''
+    top = max(values) or 1
+    blocks = '▁▂▃▄▅▆▇█'
+    return ''.join(blocks[min(len(blocks) - 1, int(value / top * (len(blocks) - 1)))] for value in values)
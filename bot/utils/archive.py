@@ -0,0 +1,191 @@
+import logging
+import time
+import asyncio
+from typing import Any, Dict, List, Optional, Tuple
+
+from bot.utils.records import SubmissionRecord
+
+log = logging.getLogger(__name__)
+
+# Relative weights of title, flair, author and subreddit columns in search ranking
+RANK_WEIGHTS = (10.0, 3.0, 2.0, 1.0)
+
+
+def match_query(text: str) -> Optional[str]:
+    """
+    Converts user search text to FTS5 query matching all words, the last one by prefix.
+
+    Returns ``None`` if the text has no words.
+
+    Parameters
+    ----------
+    text: :class:`str`
+        The search text.
+    """
+    words = text.split()
+    if not words:
+        return None
+    # Quoted words are matched as plain strings, so FTS5 operators in text are not interpreted
+    terms = ['"' + word.replace('"', '""') + '"' for word in words]
+    terms[-1] += '*'
+    return ' '.join(terms)
+
+
+class SubmissionArchive:
+    """Full-text searchable archive of delivered submissions, written by batched writer.
+
+    Delivered submissions are buffered and inserted in batches every ``archive.flush-interval``
+    seconds or once ``archive.batch-size`` is reached. The archive is bounded by age
+    (``archive.max-age``) and row count (``archive.max-rows``).
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self._buffer: List[Dict[str, Any]] = []
+        self._full: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._expired_at = 0.0
+
+    @property
+    def config(self) -> Dict[str, Any]:
+        return self.bot.config['archive']
+
+    def add(self, record: SubmissionRecord, channel_id: int, guild_id: int) -> None:
+        """
+        Buffers delivered submission for archiving.
+
+        Parameters
+        ----------
+        record: :class:`SubmissionRecord`
+            The delivered submission.
+        channel_id: :class:`int`
+            The Channel ID the submission was delivered to.
+        guild_id: :class:`int`
+            The Guild ID the submission was delivered to.
+        """
+        if not self.config['enabled'] or self._task is None:
+            return
+
+        self._buffer.append({
+            'submission_id': record.id,
+            'subreddit': record.subreddit,
+            'title': record.title,
+            'flair': record.flair or '',
+            'author': record.author,
+            'permalink': record.permalink,
+            'url': record.url,
+            'created_utc': record.created_utc,
+            'delivered_at': time.time(),
+            'channel_id': channel_id,
+            'guild_id': guild_id
+        })
+        if len(self._buffer) >= self.config['batch-size']:
+            self._full.set()
+
+    def start(self) -> None:
+        """Starts batched writer, must be called after database is connected."""
+        if self._task is None:
+            self._full = asyncio.Event()
+            self._task = asyncio.create_task(self._run(), name='SubmissionArchive')
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._full.wait(), self.config['flush-interval'])
+            except asyncio.TimeoutError:
+                pass
+            self._full.clear()
+
+            try:
+                await self.flush()
+                # Expiring once a minute, it scans the oldest rows only
+                if time.monotonic() - self._expired_at >= 60.0:
+                    self._expired_at = time.monotonic()
+                    await self.expire()
+            except Exception:
+                log.exception('Failed to write submissions archive')
+
+    async def close(self) -> None:
+        """Stops batched writer and writes buffered submissions."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        try:
+            await self.flush()
+        except Exception:
+            log.exception('Failed to write submissions archive')
+
+    async def flush(self) -> int:
+        """Writes buffered submissions to database and returns their count."""
+        if not self._buffer:
+            return 0
+
+        rows, self._buffer = self._buffer, []
+        try:
+            async with self.bot.database.transaction():
+                await self.bot.database.execute_many(
+                    'INSERT INTO archive '
+                    '(submission_id, subreddit, title, flair, author, permalink, url, created_utc, delivered_at, channel_id, guild_id) '
+                    'VALUES (:submission_id, :subreddit, :title, :flair, :author, :permalink, :url, :created_utc, '
+                    ':delivered_at, :channel_id, :guild_id)',
+                    rows
+                )
+        except BaseException:
+            # Not written submissions are written on next flush, the newest ones up to batch size
+            self._buffer = rows + self._buffer
+            dropped = len(self._buffer) - self.config['batch-size']
+            if dropped > 0:
+                log.warning(f'Dropped {dropped} submissions from archive buffer after failed write')
+                del self._buffer[:dropped]
+            raise
+        return len(rows)
+
+    async def expire(self) -> None:
+        """Deletes archived submissions older than maximum age and over maximum count."""
+        await self.bot.database.execute(
+            'DELETE FROM archive WHERE delivered_at < :until',
+            {'until': time.time() - self.config['max-age']}
+        )
+        await self.bot.database.execute(
+            'DELETE FROM archive WHERE id <= (SELECT id FROM archive ORDER BY id DESC LIMIT 1 OFFSET :max_rows)',
+            {'max_rows': self.config['max-rows']}
+        )
+
+    async def search(self, guild_id: int, text: str, page: int = 1, per_page: int = 10) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Searches archived submissions delivered to the guild, best matches first.
+
+        Returns page of results and total count of results.
+
+        Parameters
+        ----------
+        guild_id: :class:`int`
+            The Guild ID to search in.
+        text: :class:`str`
+            The search text, all words must match, the last word is matched by prefix.
+        page: :class:`int`
+            The page number starting from 1.
+        per_page: :class:`int`
+            The count of results per page.
+        """
+        query = match_query(text)
+        if query is None:
+            return [], 0
+
+        params = {'query': query, 'guild_id': guild_id}
+        total = await self.bot.database.fetch_val(
+            'SELECT COUNT(*) FROM archive_fts JOIN archive ON archive.id = archive_fts.rowid '
+            'WHERE archive_fts MATCH :query AND archive.guild_id = :guild_id',
+            params
+        )
+        weights = ', '.join(str(weight) for weight in RANK_WEIGHTS)
+        rows = await self.bot.database.fetch_all(
+            'SELECT archive.submission_id, archive.subreddit, archive.title, archive.flair, archive.author, '
+            'archive.permalink, archive.url, archive.created_utc, archive.delivered_at, archive.channel_id '
+            'FROM archive_fts JOIN archive ON archive.id = archive_fts.rowid '
+            'WHERE archive_fts MATCH :query AND archive.guild_id = :guild_id '
+            f'ORDER BY bm25(archive_fts, {weights}), archive.delivered_at DESC '
+            'LIMIT :limit OFFSET :offset',
+            {**params, 'limit': per_page, 'offset': (page - 1) * per_page}
+        )
+        return [dict(row._mapping) for row in rows], total
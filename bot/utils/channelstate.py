@@ -0,0 +1,141 @@
+import logging
+from typing import Dict, Optional, Set
+import disnake
+
+log = logging.getLogger(__name__)
+
+
+class ChannelState:
+    """Resolved feed target channel with its NSFW flag and bot's effective permissions."""
+
+    __slots__ = ('channel_id', 'channel', 'nsfw', 'can_send', 'can_embed', 'archived')
+
+    def __init__(
+        self,
+        channel_id: int,
+        channel: Optional[disnake.abc.GuildChannel] = None,
+        nsfw: bool = False,
+        can_send: bool = False,
+        can_embed: bool = False,
+        archived: bool = False
+    ):
+        self.channel_id = channel_id
+        self.channel = channel
+        self.nsfw = nsfw
+        self.can_send = can_send
+        self.can_embed = can_embed
+        self.archived = archived
+
+    def __repr__(self) -> str:
+        return (
+            f'<ChannelState channel_id={self.channel_id} found={self.channel is not None} nsfw={self.nsfw} '
+            f'can_send={self.can_send} can_embed={self.can_embed} archived={self.archived}>'
+        )
+
+    @property
+    def deliverable(self) -> bool:
+        """Whether messages can be sent to the channel now."""
+        return self.channel is not None and self.can_send and not self.archived
+
+    @classmethod
+    def resolve(cls, bot: disnake.Client, channel_id: int) -> 'ChannelState':
+        """
+        Resolves channel state from the gateway cache.
+
+        Parameters
+        ----------
+        bot: :class:`disnake.Client`
+            The bot client.
+        channel_id: :class:`int`
+            The Channel ID to resolve.
+        """
+        channel = bot.get_channel(channel_id)
+        if channel is None or not hasattr(channel, 'guild') or channel.guild.me is None:
+            return cls(channel_id)
+
+        permissions = channel.permissions_for(channel.guild.me)
+        if isinstance(channel, disnake.Thread):
+            can_send = permissions.send_messages_in_threads
+            archived = channel.archived or channel.locked
+        else:
+            can_send = permissions.send_messages
+            archived = False
+
+        return cls(
+            channel_id,
+            channel=channel,
+            nsfw=channel.is_nsfw(),
+            can_send=can_send,
+            can_embed=permissions.embed_links,
+            archived=archived
+        )
+
+
+class ChannelStateCache:
+    """Cache of feed target channels states, invalidated by gateway events.
+
+    States are resolved on first use after invalidation, so feeders check
+    channel availability and permissions without resolving them for every submission.
+    """
+
+    def __init__(self, bot: disnake.Client):
+        self.bot = bot
+        self._states: Dict[int, ChannelState] = {}
+        self._guild_channels: Dict[int, Set[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    def get(self, channel_id: int) -> ChannelState:
+        """
+        Returns cached channel state, resolving it if not cached.
+
+        Parameters
+        ----------
+        channel_id: :class:`int`
+            The Channel ID.
+        """
+        state = self._states.get(channel_id)
+        if state is None:
+            state = self._states[channel_id] = ChannelState.resolve(self.bot, channel_id)
+            if state.channel is not None:
+                self._guild_channels.setdefault(state.channel.guild.id, set()).add(channel_id)
+            if not state.deliverable:
+                log.warning(f'Feeds of channel {channel_id} are paused: {state!r}')
+        return state
+
+    def invalidate(self, channel_id: int) -> None:
+        """
+        Drops cached state of the channel.
+
+        Parameters
+        ----------
+        channel_id: :class:`int`
+            The Channel ID.
+        """
+        state = self._states.pop(channel_id, None)
+        if state is not None and state.channel is not None:
+            channels = self._guild_channels.get(state.channel.guild.id)
+            if channels is not None:
+                channels.discard(channel_id)
+
+    def invalidate_guild(self, guild_id: int) -> None:
+        """
+        Drops cached states of all channels of the guild.
+
+        Parameters
+        ----------
+        guild_id: :class:`int`
+            The Guild ID.
+        """
+        for channel_id in self._guild_channels.pop(guild_id, ()):
+            self._states.pop(channel_id, None)
+
+        # Unresolved channels are not tracked by guild, so they are resolved again too
+        for channel_id in [channel_id for channel_id, state in self._states.items() if state.channel is None]:
+            del self._states[channel_id]
+
+    def clear(self) -> None:
+        """Drops all cached states."""
+        self._states.clear()
+        self._guild_channels.clear()
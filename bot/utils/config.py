@@ -0,0 +1,276 @@
+import logging
+import copy
+import yaml
+from typing import Any, Callable, Dict, List, Set
+
+from bot.utils import exceptions
+
+log = logging.getLogger(__name__)
+
+# Default values of optional configuration keys
+DEFAULTS: Dict[str, Any] = {
+    'limits': {
+        'text-limit': 1000,
+        'feeders-limit': 5,
+        'messages-per-hour': 0,
+        'tiers': {},
+        'guild-tiers': {}
+    },
+    'feeds': {
+        'retry-delay': 5.0,
+        'poll-max-delay': 16.0,
+        'catch-up': 3600.0,
+        'checkpoint-interval': 30.0,
+        'shutdown-timeout': 10.0,
+        'backend': 'stream',
+        'restore-concurrency': 4,
+        'ranked-poll-interval': 60.0,
+        'ranked-max-rank': 10
+    },
+    'delivery': {
+        'channel-rate': 20,
+        'guild-rate': 60,
+        'policy': 'summary',
+        'max-pending': 50,
+        'concurrency': 4
+    },
+    'activity': {
+        'flush-interval': 60.0,
+        'minute-retention': 172800,
+        'hourly-retention': 2592000,
+        'daily-retention': 31536000
+    },
+    'archive': {
+        'enabled': True,
+        'flush-interval': 5.0,
+        'batch-size': 100,
+        'max-age': 2592000,
+        'max-rows': 200000
+    },
+    'runtime': {
+        'uvloop': False,
+        'http-pool': {
+            'enabled': False,
+            'limit': 100,
+            'limit-per-host': 20,
+            'keepalive-timeout': 60.0,
+            'dns-cache-ttl': 300
+        },
+        'ingestion': {
+            'mode': 'local',
+            'queue-path': 'ingest.sqlite3',
+            'poll-interval': 1.0,
+            'refresh-interval': 30.0,
+            'batch-size': 100
+        }
+    }
+}
+
+# Keys which requires bot restart to take effect
+RESTART_KEYS = ('bot.token', 'bot.sqlite-path', 'delivery.concurrency', 'runtime.')
+
+
+def _merge(defaults: Dict[str, Any], data: Dict[str, Any]) -> Dict[str, Any]:
+    result = copy.deepcopy(defaults)
+    for key, value in data.items():
+        if isinstance(value, dict) and isinstance(result.get(key), dict):
+            result[key] = _merge(result[key], value)
+        else:
+            result[key] = value
+    return result
+
+
+def _diff(old: Dict[str, Any], new: Dict[str, Any], prefix: str = '') -> Set[str]:
+    changed = set()
+    for key in old.keys() | new.keys():
+        old_value = old.get(key)
+        new_value = new.get(key)
+        if isinstance(old_value, dict) and isinstance(new_value, dict):
+            changed |= _diff(old_value, new_value, f'{prefix}{key}.')
+        elif old_value != new_value:
+            changed.add(f'{prefix}{key}')
+    return changed
+
+
+class Config:
+    """Bot configuration loaded from YAML file with live reload support."""
+
+    def __init__(self, path: str = 'config.yml'):
+        self.path = path
+        self.data = self.load()
+        self._listeners: List[Callable[[Set[str]], None]] = []
+
+    def __getitem__(self, key: str) -> Any:
+        return self.data[key]
+
+    def load(self) -> Dict[str, Any]:
+        """Loads and validates configuration from file without applying it."""
+        try:
+            with open(self.path, 'r') as fp:
+                data = yaml.safe_load(fp)
+        except (OSError, yaml.YAMLError) as e:
+            raise exceptions.InvalidConfig(str(e))
+
+        if not isinstance(data, dict):
+            raise exceptions.InvalidConfig('configuration must be a mapping')
+
+        data = _merge(DEFAULTS, data)
+        self.validate(data)
+        return data
+
+    @staticmethod
+    def validate(data: Dict[str, Any]) -> None:
+        """
+        Validates configuration data.
+
+        Parameters
+        ----------
+        data: :class:`dict`
+            The configuration data to validate.
+        """
+        for section, keys in (
+            ('bot', ('token', 'sqlite-path')),
+            ('reddit', ('user-agent', 'client-id', 'client-secret'))
+        ):
+            if not isinstance(data.get(section), dict):
+                raise exceptions.InvalidConfig(f'missing "{section}" section')
+            for key in keys:
+                if not isinstance(data[section].get(key), str):
+                    raise exceptions.InvalidConfig(f'"{section}.{key}" must be a string')
+
+        for key in ('text-limit', 'feeders-limit'):
+            value = data['limits'][key]
+            if not isinstance(value, int) or value <= 0:
+                raise exceptions.InvalidConfig(f'"limits.{key}" must be a positive integer')
+
+        # Zero delays would poll Reddit in a tight loop
+        for key in ('retry-delay', 'poll-max-delay', 'ranked-poll-interval', 'checkpoint-interval'):
+            value = data['feeds'][key]
+            if not isinstance(value, (int, float)) or value <= 0:
+                raise exceptions.InvalidConfig(f'"feeds.{key}" must be a positive number')
+
+        for key in ('catch-up', 'shutdown-timeout'):
+            value = data['feeds'][key]
+            if not isinstance(value, (int, float)) or value < 0:
+                raise exceptions.InvalidConfig(f'"feeds.{key}" must be a non-negative number')
+
+        if not isinstance(data['feeds']['restore-concurrency'], int) or data['feeds']['restore-concurrency'] <= 0:
+            raise exceptions.InvalidConfig('"feeds.restore-concurrency" must be a positive integer')
+
+        if not isinstance(data['feeds']['ranked-max-rank'], int) or not 1 <= data['feeds']['ranked-max-rank'] <= 100:
+            raise exceptions.InvalidConfig('"feeds.ranked-max-rank" must be an integer from 1 to 100')
+
+        if data['feeds']['backend'] not in ('stream', 'listing'):
+            raise exceptions.InvalidConfig('"feeds.backend" must be "stream" or "listing"')
+
+        limits = data['limits']
+        if not isinstance(limits['messages-per-hour'], int) or limits['messages-per-hour'] < 0:
+            raise exceptions.InvalidConfig('"limits.messages-per-hour" must be a non-negative integer')
+        if not isinstance(limits['tiers'], dict) or not isinstance(limits['guild-tiers'], dict):
+            raise exceptions.InvalidConfig('"limits.tiers" and "limits.guild-tiers" must be mappings')
+        for tier, quotas in limits['tiers'].items():
+            if not isinstance(quotas, dict):
+                raise exceptions.InvalidConfig(f'"limits.tiers.{tier}" must be a mapping')
+            for key, minimum in (('feeds', 1), ('messages-per-hour', 0), ('weight', 1)):
+                if key in quotas and (not isinstance(quotas[key], int) or quotas[key] < minimum):
+                    raise exceptions.InvalidConfig(f'"limits.tiers.{tier}.{key}" must be an integer of at least {minimum}')
+        for guild_id, tier in limits['guild-tiers'].items():
+            if not isinstance(guild_id, int):
+                raise exceptions.InvalidConfig(f'"limits.guild-tiers" keys must be guild IDs, got "{guild_id}"')
+            if tier != 'default' and tier not in limits['tiers']:
+                raise exceptions.InvalidConfig(f'"limits.guild-tiers.{guild_id}" refers to unknown tier "{tier}"')
+
+        delivery = data['delivery']
+        for key in ('channel-rate', 'guild-rate'):
+            if not isinstance(delivery[key], int) or delivery[key] < 0:
+                raise exceptions.InvalidConfig(f'"delivery.{key}" must be a non-negative integer')
+        for key in ('max-pending', 'concurrency'):
+            if not isinstance(delivery[key], int) or delivery[key] <= 0:
+                raise exceptions.InvalidConfig(f'"delivery.{key}" must be a positive integer')
+        if delivery['policy'] not in ('summary', 'drop-oldest', 'defer'):
+            raise exceptions.InvalidConfig('"delivery.policy" must be "summary", "drop-oldest" or "defer"')
+
+        activity = data['activity']
+        if not isinstance(activity['flush-interval'], (int, float)) or activity['flush-interval'] <= 0:
+            raise exceptions.InvalidConfig('"activity.flush-interval" must be a positive number')
+        for key in ('minute-retention', 'hourly-retention', 'daily-retention'):
+            if not isinstance(activity[key], int) or activity[key] <= 0:
+                raise exceptions.InvalidConfig(f'"activity.{key}" must be a positive integer')
+
+        archive = data['archive']
+        if not isinstance(archive['enabled'], bool):
+            raise exceptions.InvalidConfig('"archive.enabled" must be a boolean')
+        if not isinstance(archive['flush-interval'], (int, float)) or archive['flush-interval'] <= 0:
+            raise exceptions.InvalidConfig('"archive.flush-interval" must be a positive number')
+        for key in ('batch-size', 'max-age', 'max-rows'):
+            if not isinstance(archive[key], int) or archive[key] <= 0:
+                raise exceptions.InvalidConfig(f'"archive.{key}" must be a positive integer')
+
+        pool = data['runtime']['http-pool']
+        for key in ('limit', 'limit-per-host', 'dns-cache-ttl'):
+            if not isinstance(pool[key], int) or pool[key] < 0:
+                raise exceptions.InvalidConfig(f'"runtime.http-pool.{key}" must be a non-negative integer')
+        if not isinstance(pool['keepalive-timeout'], (int, float)) or pool['keepalive-timeout'] < 0:
+            raise exceptions.InvalidConfig('"runtime.http-pool.keepalive-timeout" must be a non-negative number')
+
+        ingestion = data['runtime']['ingestion']
+        if ingestion['mode'] not in ('local', 'queue'):
+            raise exceptions.InvalidConfig('"runtime.ingestion.mode" must be "local" or "queue"')
+        if not isinstance(ingestion['queue-path'], str):
+            raise exceptions.InvalidConfig('"runtime.ingestion.queue-path" must be a string')
+        for key in ('poll-interval', 'refresh-interval'):
+            if not isinstance(ingestion[key], (int, float)) or ingestion[key] <= 0:
+                raise exceptions.InvalidConfig(f'"runtime.ingestion.{key}" must be a positive number')
+        if not isinstance(ingestion['batch-size'], int) or ingestion['batch-size'] <= 0:
+            raise exceptions.InvalidConfig('"runtime.ingestion.batch-size" must be a positive integer')
+
+    def add_listener(self, callback: Callable[[Set[str]], None]) -> None:
+        """
+        Adds callback which is called with changed keys after every reload.
+
+        Parameters
+        ----------
+        callback: Callable[[Set[:class:`str`]], None]
+            The callback accepting set of changed dotted keys (e.g. ``reddit.client-id``).
+        """
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback: Callable[[Set[str]], None]) -> None:
+        """
+        Removes callback added by :meth:`add_listener`.
+
+        Parameters
+        ----------
+        callback: Callable[[Set[:class:`str`]], None]
+            The callback to remove.
+        """
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def reload(self) -> Set[str]:
+        """
+        Reloads configuration from file and notifies listeners about changes.
+
+        Raises :class:`InvalidConfig` and keeps current configuration if the file is invalid.
+        Returns set of changed dotted keys.
+        """
+        data = self.load()
+        changed = _diff(self.data, data)
+        self.data = data
+
+        if not changed:
+            log.info('Configuration reloaded without changes')
+            return changed
+
+        log.info(f'Configuration reloaded, changed: {", ".join(sorted(changed))}')
+        for key in sorted(changed):
+            if key.startswith(RESTART_KEYS):
+                log.warning(f'Changed "{key}" will take effect after restart')
+
+        for callback in list(self._listeners):
+            try:
+                callback(changed)
+            except Exception:
+                log.exception('Raised exception in configuration listener')
+
+        return changed
@@ -0,0 +1,331 @@
+import logging
+import time
+import asyncio
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+import disnake
+from disnake.utils import escape_markdown
+
+from bot.utils.formatting import CONTENT_LIMIT
+from bot.utils.records import SubmissionRecord
+
+log = logging.getLogger(__name__)
+
+WINDOW = 60.0
+
+
+class RateWindow:
+    """Sliding one minute window of sent messages."""
+
+    __slots__ = ('sent',)
+
+    def __init__(self):
+        self.sent: Deque[float] = deque()
+
+    def _expire(self, now: float) -> None:
+        while self.sent and self.sent[0] <= now - WINDOW:
+            self.sent.popleft()
+
+    def wait_time(self, now: float, rate: int) -> float:
+        """Returns seconds until the window allows one more message, 0 if allowed now."""
+        if rate <= 0:
+            return 0.0
+        self._expire(now)
+        if len(self.sent) < rate:
+            return 0.0
+        return self.sent[-rate] + WINDOW - now
+
+    def add(self, now: float) -> None:
+        self.sent.append(now)
+
+    def idle(self, now: float) -> bool:
+        """Returns whether the window has no messages sent within the last minute."""
+        self._expire(now)
+        return not self.sent
+
+
+class DeliveryGate:
+    """Per-channel and per-guild delivery caps (messages per minute) with overflow policies.
+
+    Messages over the caps are held in per-channel pending queue and handled by policy:
+
+    - ``summary``: pending submissions are collapsed into one summary message.
+    - ``drop-oldest``: the oldest pending submission is dropped when the queue is full.
+    - ``defer``: pending submissions are sent later, newest are dropped when the queue is full.
+    """
+
+    def __init__(self, feeder):
+        self.feeder = feeder
+        self._channel_windows: Dict[int, RateWindow] = {}
+        self._guild_windows: Dict[int, RateWindow] = {}
+        self._pending: Dict[int, Deque[Tuple[SubmissionRecord, Dict[str, Any]]]] = {}
+        self._flushers: Dict[int, asyncio.Task] = {}
+        self._pruned_at = 0.0
+        # Counters of shed submissions by way of shedding
+        self.shed: Dict[str, int] = {'collapsed': 0, 'dropped': 0, 'deferred': 0}
+
+    @property
+    def config(self) -> Dict[str, Any]:
+        return self.feeder.config['delivery']
+
+    @property
+    def pending(self) -> int:
+        return sum(len(queue) for queue in self._pending.values())
+
+    def _wait_time(self, channel: disnake.TextChannel, now: float) -> float:
+        channel_window = self._channel_windows.setdefault(channel.id, RateWindow())
+        guild_window = self._guild_windows.setdefault(channel.guild.id, RateWindow())
+        return max(
+            channel_window.wait_time(now, self.config['channel-rate']),
+            guild_window.wait_time(now, self.config['guild-rate'])
+        )
+
+    def _consume(self, channel: disnake.TextChannel, now: float) -> None:
+        self._channel_windows[channel.id].add(now)
+        self._guild_windows[channel.guild.id].add(now)
+
+    def _prune(self, now: float) -> None:
+        """Drops windows of channels and guilds idle for a minute, at most once a minute."""
+        if now - self._pruned_at < WINDOW:
+            return
+        self._pruned_at = now
+        for channel_id in [
+            channel_id for channel_id, window in self._channel_windows.items()
+            if channel_id not in self._pending and window.idle(now)
+        ]:
+            del self._channel_windows[channel_id]
+        for guild_id in [guild_id for guild_id, window in self._guild_windows.items() if window.idle(now)]:
+            del self._guild_windows[guild_id]
+
+    async def submit(self, channel: disnake.TextChannel, record: SubmissionRecord, message: Dict[str, Any]) -> None:
+        """
+        Sends rendered submission message if caps allow it, else applies overflow policy.
+
+        Parameters
+        ----------
+        channel: :class:`disnake.TextChannel`
+            The target channel.
+        record: :class:`SubmissionRecord`
+            The rendered submission.
+        message: Dict[:class:`str`, Any]
+            The keyword arguments of :meth:`disnake.abc.Messageable.send`.
+        """
+        now = time.monotonic()
+        self._prune(now)
+        queue = self._pending.get(channel.id)
+        if not queue and self._wait_time(channel, now) == 0.0:
+            self._consume(channel, now)
+            await self.feeder.deliver(channel, message, (record,))
+            return
+
+        policy = self.config['policy']
+        max_pending = self.config['max-pending']
+        queue = self._pending.setdefault(channel.id, deque())
+
+        if len(queue) >= max_pending:
+            if policy == 'defer':
+                self.shed['dropped'] += 1
+                self.feeder.handled(channel.id, (record,))
+                log.warning(f'Dropped submission {record.id} for channel {channel.id}: pending queue is full')
+                return
+            dropped, _ = queue.popleft()
+            self.shed['dropped'] += 1
+            self.feeder.handled(channel.id, (dropped,))
+
+        queue.append((record, message))
+        if policy == 'defer':
+            self.shed['deferred'] += 1
+
+        if channel.id not in self._flushers:
+            log.warning(f'Delivery cap reached for channel {channel.id} (guild {channel.guild.id}), applying "{policy}" policy')
+            self._flushers[channel.id] = asyncio.create_task(self._flush(channel), name=f'DeliveryGate_{channel.id}')
+
+    async def _flush(self, channel: disnake.TextChannel) -> None:
+        queue = self._pending[channel.id]
+        while queue:
+            wait_time = self._wait_time(channel, time.monotonic())
+            if wait_time > 0:
+                await asyncio.sleep(wait_time)
+                continue
+
+            self._consume(channel, time.monotonic())
+            if self.config['policy'] == 'summary' and len(queue) > 1:
+                items = list(queue)
+                queue.clear()
+                self.shed['collapsed'] += len(items)
+                records = [record for record, _ in items]
+                await self.feeder.deliver(channel, {'content': self.render_summary(records)}, records)
+            else:
+                record, message = queue.popleft()
+                await self.feeder.deliver(channel, message, (record,))
+
+        del self._pending[channel.id]
+        del self._flushers[channel.id]
+
+    @staticmethod
+    def render_summary(records: list) -> str:
+        """
+        Renders summary message of collapsed submissions.
+
+        Parameters
+        ----------
+        records: List[:class:`SubmissionRecord`]
+            The collapsed submissions.
+        """
+        content = f'*Collapsed {len(records)} submissions due to high volume:*'
+        for index, record in enumerate(records):
+            # Angle brackets suppress link embeds
+            line = f'\n- `r/{record.subreddit}`: [{escape_markdown(record.title[:100])}](<https://reddit.com{record.permalink}>)'
+            rest = f'\n*...and {len(records) - index} more*'
+            if len(content) + len(line) + len(rest) > CONTENT_LIMIT:
+                content += rest
+                break
+            content += line
+        return content
+
+    def stop(self) -> int:
+        """
+        Stops delayed deliveries and schedules submissions held in every channel at once.
+
+        Held submissions of a channel are collapsed into one summary message if there are many,
+        so they are sent within shutdown deadline regardless of caps. Submissions held for
+        channels which are not deliverable anymore are left not handled. Returns count of
+        scheduled submissions.
+        """
+        for task in self._flushers.values():
+            task.cancel()
+        self._flushers.clear()
+
+        scheduled = 0
+        for channel_id, queue in self._pending.items():
+            state = self.feeder.channels.get(channel_id)
+            if not queue or not state.deliverable:
+                continue
+
+            records = [record for record, _ in queue]
+            if len(queue) > 1:
+                self.shed['collapsed'] += len(records)
+                self.feeder.schedule(state.channel, {'content': self.render_summary(records)}, records)
+            else:
+                self.feeder.schedule(state.channel, queue[0][1], records)
+            scheduled += len(records)
+        self._pending.clear()
+        return scheduled
+
+
+class FairScheduler:
+    """Deficit round-robin scheduler of message sends across guilds.
+
+    Every guild with pending sends gets its turn in round-robin order, with quantum
+    of sends per turn equal to its tier weight, so guilds with many high-volume feeds
+    don't delay sends of other guilds. Sends are run by fixed count of workers.
+    """
+
+    def __init__(self, concurrency: int, weight: Callable[[int], int]):
+        self.concurrency = concurrency
+        self.weight = weight
+        self._queues: Dict[int, Deque[Tuple[Callable[[], Awaitable[Any]], asyncio.Future]]] = {}
+        self._deficits: Dict[int, int] = {}
+        # Guilds with pending sends in round-robin order, the first one has current turn
+        self._active: Deque[int] = deque()
+        self._turn_started = False
+        self._ready: Optional[asyncio.Event] = None
+        self._workers: List[asyncio.Task] = []
+
+    @property
+    def pending(self) -> Dict[int, int]:
+        """Count of pending sends by Guild ID."""
+        return {guild_id: len(queue) for guild_id, queue in self._queues.items()}
+
+    def submit(self, guild_id: int, send: Callable[[], Awaitable[Any]]) -> asyncio.Future:
+        """
+        Schedules send and returns future of its result.
+
+        Parameters
+        ----------
+        guild_id: :class:`int`
+            The Guild ID of the target channel.
+        send: Callable[[], Awaitable[Any]]
+            The function which starts sending.
+        """
+        if not self._workers:
+            self._ready = asyncio.Event()
+            self._workers = [
+                asyncio.create_task(self._worker(), name=f'FairScheduler_{index}')
+                for index in range(self.concurrency)
+            ]
+
+        future = asyncio.get_running_loop().create_future()
+        queue = self._queues.get(guild_id)
+        if queue is None:
+            queue = self._queues[guild_id] = deque()
+            self._deficits[guild_id] = 0
+            self._active.append(guild_id)
+        queue.append((send, future))
+        self._ready.set()
+        return future
+
+    def _next(self) -> Optional[Tuple[Callable[[], Awaitable[Any]], asyncio.Future]]:
+        while self._active:
+            guild_id = self._active[0]
+            if not self._turn_started:
+                self._deficits[guild_id] += self.weight(guild_id)
+                self._turn_started = True
+
+            if self._deficits[guild_id] < 1:
+                # Turn is over, passing it to the next guild
+                self._active.rotate(-1)
+                self._turn_started = False
+                continue
+
+            queue = self._queues[guild_id]
+            item = queue.popleft()
+            self._deficits[guild_id] -= 1
+            if not queue:
+                # Idle guilds don't keep deficit
+                del self._queues[guild_id]
+                del self._deficits[guild_id]
+                self._active.popleft()
+                self._turn_started = False
+            return item
+        return None
+
+    async def _worker(self) -> None:
+        while True:
+            item = self._next()
+            if item is None:
+                self._ready.clear()
+                await self._ready.wait()
+                continue
+
+            send, future = item
+            if future.done():
+                continue
+            try:
+                result = await send()
+            except asyncio.CancelledError:
+                future.cancel()
+                raise
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            else:
+                if not future.done():
+                    future.set_result(result)
+
+    def stop(self) -> int:
+        """Stops workers, cancels pending sends and returns count of cancelled sends."""
+        for worker in self._workers:
+            worker.cancel()
+        self._workers = []
+
+        cancelled = 0
+        for queue in self._queues.values():
+            for _, future in queue:
+                if future.cancel():
+                    cancelled += 1
+        self._queues.clear()
+        self._deficits.clear()
+        self._active.clear()
+        self._turn_started = False
+        return cancelled
@@ -8,6 +8,16 @@ class CannotSendMessages(Exception):
         return 'Bot don\'t have permission to Send Messages to channel'
 
 
+class ChannelNotFound(Exception):
+    """Raised when the bot can't find channel with given ID."""
+
+    def __init__(self, channel_id: int):
+        self.channel_id = channel_id
+
+    def __str__(self):
+        return 'Channel {0} was not found'.format(self.channel_id)
+
+
 class SubredditNotFound(Exception):
     """Raised when the bot can't find subreddit or subreddit is private only with given display name."""
 
@@ -37,6 +47,7 @@ class SubredditIsNSFW(Exception):
     def __str__(self):
         return 'Subreddit "{0}" is NSFW (over 18) but Channel is not NSFW marked'.format(self.name)
 
+
 class FeedExists(Exception):
     """Raised when the feed is exists in guild/channel."""
 
@@ -45,3 +56,23 @@ class FeedExists(Exception):
 
     def __str__(self):
         return 'Feeder is exists in guild tasks'
+
+
+class FeedQuotaExceeded(Exception):
+    """Raised when the guild has reached feeds quota of its tier."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+
+    def __str__(self):
+        return 'Reached limit of feeds (max: {0}) in guild'.format(self.limit)
+
+
+class InvalidConfig(Exception):
+    """Raised when the configuration file is invalid."""
+
+    def __init__(self, reason: str):
+        self.reason = reason
+
+    def __str__(self):
+        return 'Invalid configuration: {0}'.format(self.reason)
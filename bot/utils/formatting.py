@@ -0,0 +1,196 @@
+import re
+from typing import Dict, Pattern
+
+# Discord message content and embed footer length limits
+CONTENT_LIMIT = 2000
+FOOTER_LIMIT = 2048
+
+TRUNCATION_MARK = ' *[...]*'
+
+# Poll submissions have a link to the poll at the end of selftext
+POLL_LINK = re.compile(r'\n\n\[View Poll\]\(https://www\.reddit\.com/poll/\w+\)\s*$')
+
+# Tokens of selftext which are replaced in single pass, and their replacements:
+# HTML-like zero-width space is removed, Reddit spoilers are replaced into Discord format,
+# "less/greater than" characters are escaped to exclude Discord mention chance
+SELFTEXT_TOKENS = re.compile(r'&#x200B;|>!|!<|[<>]')
+SELFTEXT_REPLACEMENTS = {
+    '&#x200B;': '',
+    '>!': '||',
+    '!<': '||',
+    '<': '\\<',
+    '>': '\\>'
+}
+
+# For spoiler submissions whole selftext is spoiler, so inner spoilers are removed
+SPOILER_SELFTEXT_TOKENS = re.compile(r'&#x200B;|>!|!<|\|\||[<>]')
+SPOILER_SELFTEXT_REPLACEMENTS = {
+    '&#x200B;': '',
+    '>!': '',
+    '!<': '',
+    '||': '',
+    '<': '\\<',
+    '>': '\\>'
+}
+
+# Markup which must be closed if truncated text has it opened, escaped characters are skipped.
+# Longer tokens go first, so "**" is not taken for two italic marks
+MARKUP_TOKENS = re.compile(r'\\.|```|`|\|\||\*\*|\*|__|_|~~', re.DOTALL)
+# Closing every kind of markup takes at most 15 characters
+MARKUP_RESERVE = 16
+
+
+def selftext_bound(text_limit: int) -> int:
+    """
+    Returns length of selftext prefix which is enough for formatting.
+
+    Zero-width spaces are removed, so a bit more than limit is processed.
+
+    Parameters
+    ----------
+    text_limit: :class:`int`
+        The maximum count of selftext characters to keep.
+    """
+    return text_limit * 2 + 64
+
+
+def _transform(text: str, end: int, limit: int, tokens: Pattern, replacements: Dict[str, str]) -> str:
+    pieces = []
+    size = 0
+    pos = 0
+
+    for match in tokens.finditer(text, 0, end):
+        start = match.start()
+        if start > pos:
+            take = min(start - pos, limit - size)
+            pieces.append(text[pos:pos + take])
+            size += take
+            if size >= limit:
+                return ''.join(pieces)
+
+        replacement = replacements[match.group()]
+        if size + len(replacement) > limit:
+            # Never split a replacement such as escaped character
+            return ''.join(pieces)
+        pieces.append(replacement)
+        size += len(replacement)
+        pos = match.end()
+
+    pieces.append(text[pos:pos + min(end - pos, limit - size)])
+    return ''.join(pieces)
+
+
+def _close_markup(text: str) -> str:
+    opened = []
+    code = None
+    for match in MARKUP_TOKENS.finditer(text):
+        token = match.group()
+        if code is not None:
+            # Inside of code any other markup and backslash are literal
+            if token == code or (code == '`' and token == '\\`'):
+                opened.pop()
+                code = None
+            continue
+        if token[0] == '\\':
+            continue
+        if token in ('```', '`'):
+            code = token
+            opened.append(token)
+            continue
+        # Underscores inside of words are literal
+        start, end = match.span()
+        if token == '_' and 0 < start and end < len(text) and text[start - 1].isalnum() and text[end].isalnum():
+            continue
+
+        if token in opened:
+            del opened[len(opened) - 1 - opened[::-1].index(token)]
+        else:
+            opened.append(token)
+
+    # Closing most recently opened markup first
+    for token in reversed(opened):
+        text += '\n```' if token == '```' else token
+    return text
+
+
+def _truncate(text: str) -> str:
+    # Cutting at word boundary if it's not too far away
+    boundary = max(text.rfind(' '), text.rfind('\n'))
+    if boundary >= len(text) * 0.8:
+        text = text[:boundary]
+    text = text.rstrip()
+
+    # Dangling backslash would escape the truncation mark
+    if (len(text) - len(text.rstrip('\\'))) % 2 == 1:
+        text = text[:-1]
+
+    return _close_markup(text) + TRUNCATION_MARK
+
+
+def format_selftext(text: str, text_limit: int, max_length: int, *, spoiler: bool = False, poll: bool = False) -> str:
+    """
+    Formats submission selftext to Discord message markup.
+
+    Only bounded prefix of the text is processed, so large selftext doesn't cost
+    more than short one. Truncated text keeps spoilers and markup closed.
+
+    Parameters
+    ----------
+    text: :class:`str`
+        The submission selftext.
+    text_limit: :class:`int`
+        The maximum count of selftext characters to keep.
+    max_length: :class:`int`
+        The maximum length of returned text, including spoiler and truncation marks.
+    spoiler: :class:`bool`
+        Whether the submission is marked as spoiler.
+    poll: :class:`bool`
+        Whether the submission is poll.
+    """
+    end = len(text)
+    if poll:
+        match = POLL_LINK.search(text, max(0, end - 128))
+        if match:
+            end = match.start()
+
+    if end == 0:
+        return ''
+
+    overhead = 4 if spoiler else 0
+    limit = min(text_limit, max_length - overhead - len(TRUNCATION_MARK) - MARKUP_RESERVE)
+    if limit <= 0:
+        return ''
+
+    bound = min(end, selftext_bound(limit))
+
+    if spoiler:
+        result = _transform(text, bound, limit, SPOILER_SELFTEXT_TOKENS, SPOILER_SELFTEXT_REPLACEMENTS)
+    else:
+        result = _transform(text, bound, limit, SELFTEXT_TOKENS, SELFTEXT_REPLACEMENTS)
+
+    # Selftext of zero-width spaces only has nothing to show, not even truncation mark
+    if result.strip() == '':
+        return ''
+
+    if len(result) >= limit or bound < end:
+        result = _truncate(result)
+
+    if spoiler:
+        return f'||{result}||'
+    return result
+
+
+def fit_content(content: str, limit: int = CONTENT_LIMIT) -> str:
+    """
+    Truncates message content to fit Discord limit.
+
+    Parameters
+    ----------
+    content: :class:`str`
+        The message content.
+    limit: :class:`int`
+        The maximum length of message content.
+    """
+    if len(content) <= limit:
+        return content
+    return _truncate(content[:limit - len(TRUNCATION_MARK) - MARKUP_RESERVE])
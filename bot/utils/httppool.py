@@ -0,0 +1,138 @@
+import logging
+from types import SimpleNamespace
+from typing import Any, Dict, Optional
+import aiohttp
+from asyncprawcore import Requestor
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+log = logging.getLogger(__name__)
+
+
+class FastJSONResponse(aiohttp.ClientResponse):
+    """aiohttp response which parses JSON body with orjson."""
+
+    async def json(self, *, loads=None, **kwargs) -> Any:
+        return await super().json(loads=loads or orjson.loads, **kwargs)
+
+
+class SharedSessionRequestor(Requestor):
+    """asyncprawcore requestor which doesn't close shared HTTP session on Reddit client close."""
+
+    async def close(self):
+        pass
+
+
+class FastJSONRequestor(Requestor):
+    """asyncprawcore requestor with own HTTP session which parses JSON responses with orjson."""
+
+    def __init__(self, *args, **kwargs):
+        if kwargs.get('session') is None:
+            kwargs['session'] = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=None),
+                response_class=FastJSONResponse
+            )
+        super().__init__(*args, **kwargs)
+
+
+def json_parser() -> str:
+    """Returns name of JSON parser of Reddit responses."""
+    return f'orjson {orjson.__version__}' if orjson is not None else 'json (orjson is not installed)'
+
+
+def requestor_options(session: Optional[aiohttp.ClientSession] = None) -> Dict[str, Any]:
+    """
+    Returns keyword arguments of :class:`asyncpraw.Reddit` for its HTTP requestor.
+
+    Requests use the shared session if given. Listings are large JSON documents,
+    so responses are parsed with orjson if it's installed, with or without shared session.
+
+    Parameters
+    ----------
+    session: Optional[:class:`aiohttp.ClientSession`]
+        The shared HTTP session of :class:`HTTPPool`.
+    """
+    if session is not None:
+        return {'requestor_class': SharedSessionRequestor, 'requestor_kwargs': {'session': session}}
+    if orjson is not None:
+        return {'requestor_class': FastJSONRequestor}
+    return {}
+
+
+class HTTPPool:
+    """Shared HTTP session with tuned connection pooling and connection reuse statistics.
+
+    Must be created inside running event loop.
+    """
+
+    def __init__(
+        self,
+        limit: int = 100,
+        limit_per_host: int = 20,
+        keepalive_timeout: float = 60.0,
+        dns_cache_ttl: int = 300
+    ):
+        self.counters: Dict[str, int] = {
+            'requests': 0,
+            'connections_created': 0,
+            'connections_reused': 0,
+            'dns_cache_hits': 0,
+            'dns_cache_misses': 0
+        }
+
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_end.append(self._count('requests'))
+        trace_config.on_connection_create_end.append(self._count('connections_created'))
+        trace_config.on_connection_reuseconn.append(self._count('connections_reused'))
+        trace_config.on_dns_cache_hit.append(self._count('dns_cache_hits'))
+        trace_config.on_dns_cache_miss.append(self._count('dns_cache_misses'))
+
+        self.connector = aiohttp.TCPConnector(
+            limit=limit,
+            limit_per_host=limit_per_host,
+            keepalive_timeout=keepalive_timeout,
+            use_dns_cache=True,
+            ttl_dns_cache=dns_cache_ttl,
+            enable_cleanup_closed=True
+        )
+        self.session = aiohttp.ClientSession(
+            connector=self.connector,
+            timeout=aiohttp.ClientTimeout(total=None),
+            trace_configs=[trace_config],
+            # Parsing responses with orjson if installed, as requestor_options() does without pool
+            response_class=FastJSONResponse if orjson is not None else aiohttp.ClientResponse
+        )
+
+    def _count(self, name: str):
+        async def callback(session: aiohttp.ClientSession, context: SimpleNamespace, params: Any) -> None:
+            self.counters[name] += 1
+        return callback
+
+    @property
+    def reuse_ratio(self) -> float:
+        """Ratio of requests which reused pooled connection."""
+        total = self.counters['connections_created'] + self.counters['connections_reused']
+        if total == 0:
+            return 0.0
+        return self.counters['connections_reused'] / total
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns counters of connection pool and current pool state."""
+        return {
+            **self.counters,
+            'reuse_ratio': self.reuse_ratio,
+            'limit': self.connector.limit,
+            'limit_per_host': self.connector.limit_per_host
+        }
+
+    async def close(self) -> None:
+        """Closes shared HTTP session."""
+        stats = self.stats()
+        log.info(
+            f'Closing HTTP pool: {stats["requests"]} requests, {stats["connections_created"]} connections created, '
+            f'{stats["connections_reused"]} reused ({stats["reuse_ratio"]:.1%})'
+        )
+        await self.session.close()
@@ -0,0 +1,462 @@
+import logging
+import json
+import random
+import time
+import asyncio
+from collections import deque
+from typing import Deque, Dict, List, Optional, Set, Tuple
+from databases import Database
+import asyncpraw
+
+from bot.utils.httppool import json_parser, requestor_options
+from bot.utils.listing import ListingPoller
+from bot.utils.records import SubmissionRecord
+
+log = logging.getLogger(__name__)
+
+QUEUE_SCHEMA = (
+    '''
+    CREATE TABLE IF NOT EXISTS "queue" (
+        "id" INTEGER PRIMARY KEY AUTOINCREMENT,
+        "subreddit" TEXT NOT NULL,
+        "record" TEXT NOT NULL,
+        "queued_at" REAL NOT NULL
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS "sources" (
+        "subreddit" TEXT NOT NULL PRIMARY KEY,
+        "created_utc" REAL NOT NULL
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS "consumers" (
+        "name" TEXT NOT NULL PRIMARY KEY,
+        "acked_id" INTEGER NOT NULL
+    )
+    '''
+)
+
+
+class IngestQueue:
+    """Durable local queue of submission records in SQLite database.
+
+    Shared by ingestion worker, which puts records of polled subreddits, and the bot,
+    which reads them after its acknowledged position. Database is in WAL mode,
+    so both processes can use it at the same time.
+    """
+
+    def __init__(self, path: str):
+        self.database = Database(f'sqlite:///{path}', timeout=30.0)
+
+    async def connect(self) -> None:
+        """Connects to queue database and creates its tables."""
+        await self.database.connect()
+        await self.database.execute('PRAGMA journal_mode = WAL')
+        for statement in QUEUE_SCHEMA:
+            await self.database.execute(statement)
+
+    async def close(self) -> None:
+        if self.database.is_connected:
+            await self.database.disconnect()
+
+    async def put(self, subreddit: str, records: List[SubmissionRecord]) -> None:
+        """
+        Puts records of subreddit to queue and remembers the newest creation time of subreddit.
+
+        Parameters
+        ----------
+        subreddit: :class:`str`
+            The Subreddit display name.
+        records: List[:class:`SubmissionRecord`]
+            The records, oldest first.
+        """
+        now = time.time()
+        async with self.database.transaction():
+            await self.database.execute_many(
+                'INSERT INTO queue (subreddit, record, queued_at) VALUES (:subreddit, :record, :queued_at)',
+                [
+                    {'subreddit': subreddit, 'record': json.dumps(record.to_dict()), 'queued_at': now}
+                    for record in records
+                ]
+            )
+            await self.database.execute(
+                'INSERT INTO sources (subreddit, created_utc) VALUES (:subreddit, :created_utc) '
+                'ON CONFLICT (subreddit) DO UPDATE SET created_utc = MAX(created_utc, excluded.created_utc)',
+                {'subreddit': subreddit.lower(), 'created_utc': max(record.created_utc for record in records)}
+            )
+
+    async def sources(self) -> Dict[str, float]:
+        """Returns the newest queued creation time by lowercase subreddit name."""
+        rows = await self.database.fetch_all('SELECT subreddit, created_utc FROM sources')
+        return {row['subreddit']: row['created_utc'] for row in rows}
+
+    async def fetch(self, after_id: int, limit: int) -> List[Tuple[int, str, SubmissionRecord]]:
+        """
+        Returns queued records after the ID, oldest first.
+
+        Parameters
+        ----------
+        after_id: :class:`int`
+            The queue ID to read after.
+        limit: :class:`int`
+            The maximum count of records.
+        """
+        rows = await self.database.fetch_all(
+            'SELECT id, subreddit, record FROM queue WHERE id > :after_id ORDER BY id LIMIT :limit',
+            {'after_id': after_id, 'limit': limit}
+        )
+        return [(row['id'], row['subreddit'], SubmissionRecord.from_dict(json.loads(row['record']))) for row in rows]
+
+    async def fetch_subreddit(self, subreddit: str, after_id: int, until_id: int) -> List[Tuple[int, SubmissionRecord]]:
+        """
+        Returns queued records of subreddit in range of IDs, oldest first.
+
+        Parameters
+        ----------
+        subreddit: :class:`str`
+            The Subreddit name.
+        after_id: :class:`int`
+            The queue ID to read after.
+        until_id: :class:`int`
+            The last queue ID to read.
+        """
+        rows = await self.database.fetch_all(
+            'SELECT id, record FROM queue WHERE id > :after_id AND id <= :until_id AND lower(subreddit) = :subreddit '
+            'ORDER BY id',
+            {'after_id': after_id, 'until_id': until_id, 'subreddit': subreddit.lower()}
+        )
+        return [(row['id'], SubmissionRecord.from_dict(json.loads(row['record']))) for row in rows]
+
+    async def prune(self, max_age: float) -> None:
+        """
+        Deletes queued records older than maximum age, they are not caught up anymore.
+
+        Parameters
+        ----------
+        max_age: :class:`float`
+            The maximum age in seconds of queued records.
+        """
+        await self.database.execute('DELETE FROM queue WHERE queued_at < :until', {'until': time.time() - max_age})
+
+    async def acked(self, consumer: str) -> int:
+        """Returns the last acknowledged queue ID of consumer."""
+        acked_id = await self.database.fetch_val(
+            'SELECT acked_id FROM consumers WHERE name = :name',
+            {'name': consumer}
+        )
+        return acked_id or 0
+
+    async def ack(self, consumer: str, acked_id: int) -> None:
+        """
+        Acknowledges records up to the ID and deletes them from queue.
+
+        Parameters
+        ----------
+        consumer: :class:`str`
+            The consumer name.
+        acked_id: :class:`int`
+            The last handled queue ID.
+        """
+        async with self.database.transaction():
+            await self.database.execute(
+                'INSERT OR REPLACE INTO consumers (name, acked_id) VALUES (:name, :acked_id)',
+                {'name': consumer, 'acked_id': acked_id}
+            )
+            await self.database.execute('DELETE FROM queue WHERE id <= :acked_id', {'acked_id': acked_id})
+
+
+class IngestWorker:
+    """Standalone ingestion worker which polls subreddits of feeds and puts new submissions to queue.
+
+    Subreddits of ``new`` feeds are read from the bot database every ``runtime.ingestion.refresh-interval``
+    seconds. After restart, every subreddit resumes from its newest queued submission if it's
+    not older than ``feeds.catch-up``, so submissions created while worker was stopped are not lost.
+    """
+
+    def __init__(self, config, database: Database, queue: IngestQueue):
+        self.config = config
+        self.database = database
+        self.queue = queue
+        self.reddit: Optional[asyncpraw.Reddit] = None
+        self.pollers: Dict[str, asyncio.Task] = {}
+
+    async def run(self, stop: asyncio.Event) -> None:
+        """
+        Runs worker until stop event is set.
+
+        Parameters
+        ----------
+        stop: :class:`asyncio.Event`
+            The event which stops the worker.
+        """
+        self.reddit = asyncpraw.Reddit(
+            client_id=self.config['reddit']['client-id'],
+            client_secret=self.config['reddit']['client-secret'],
+            password=self.config['reddit'].get('password'),
+            user_agent=self.config['reddit']['user-agent'],
+            username=self.config['reddit'].get('username'),
+            **requestor_options()
+        )
+        log.info(f'Parsing Reddit responses with {json_parser()}')
+        try:
+            while not stop.is_set():
+                try:
+                    await self.refresh()
+                except Exception:
+                    log.exception('Failed to refresh subreddits of feeds')
+                try:
+                    await asyncio.wait_for(stop.wait(), self.config['runtime']['ingestion']['refresh-interval'])
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            for task in self.pollers.values():
+                task.cancel()
+            if self.pollers:
+                await asyncio.wait(set(self.pollers.values()))
+            log.info(f'Stopped {len(self.pollers)} pollers')
+            await self.reddit.close()
+
+    async def refresh(self) -> None:
+        """Starts pollers of new subreddits of feeds, stops pollers of unsubscribed ones and prunes old records."""
+        await self.queue.prune(self.config['feeds']['catch-up'])
+
+        rows = await self.database.fetch_all('SELECT DISTINCT subreddit FROM feeds WHERE kind = \'new\'')
+        subreddits = {row['subreddit'].lower(): row['subreddit'] for row in rows}
+
+        for key in self.pollers.keys() - subreddits.keys():
+            self.pollers.pop(key).cancel()
+            log.info(f'Stopped polling r/{key}')
+
+        sources = await self.queue.sources()
+        for key in subreddits.keys() - self.pollers.keys():
+            newest = sources.get(key, 0.0)
+            if newest < time.time() - self.config['feeds']['catch-up']:
+                newest = 0.0
+            self.pollers[key] = asyncio.create_task(self.ingest(subreddits[key], newest), name=f'IngestWorker_{key}')
+            log.info(f'Started polling r/{subreddits[key]}')
+
+    async def ingest(self, subreddit: str, newest: float) -> None:
+        poller = ListingPoller(self.reddit, subreddit, lambda: self.config['limits']['text-limit'], skip_existing=not newest)
+        first_poll = True
+        delay = 1.0
+
+        while True:
+            try:
+                records = await poller.poll()
+            except Exception:
+                log.exception(f'Raised exception in ingestion poller (r/{subreddit})')
+                await asyncio.sleep(self.config['feeds']['retry-delay'])
+                continue
+
+            # Resumed polling yields recent submissions which were already queued
+            if first_poll:
+                records = [record for record in records if record.created_utc > newest]
+                first_poll = False
+
+            if records:
+                await self.queue.put(subreddit, records)
+                delay = 1.0
+
+            # Exponential backoff with jitter for quiet subreddits, as feeders do
+            max_jitter = delay / 16.0
+            await asyncio.sleep(delay + random.random() * max_jitter - max_jitter / 2)
+            if not records:
+                delay = min(delay * 2, self.config['feeds']['poll-max-delay'])
+
+
+class QueueSubscription:
+    """Subscription of feed to queued records of subreddit."""
+
+    __slots__ = ('feed', 'queue', 'outstanding', 'handled')
+
+    def __init__(self, feed: Tuple[int, str]):
+        self.feed = feed
+        self.queue: asyncio.Queue[Tuple[int, SubmissionRecord]] = asyncio.Queue()
+        # Queue IDs of records put to the feed, kept until they and every older record are handled
+        self.outstanding: Deque[int] = deque()
+        # Handled queue IDs of outstanding records, records held by delivery caps are handled out of order
+        self.handled: Set[int] = set()
+
+    def __len__(self) -> int:
+        return len(self.outstanding) - len(self.handled)
+
+    def put(self, row_id: int, record: SubmissionRecord) -> None:
+        self.outstanding.append(row_id)
+        self.queue.put_nowait((row_id, record))
+
+    def done(self, row_id: int) -> None:
+        """Marks record as handled by the feed."""
+        if not self.outstanding or row_id < self.outstanding[0]:
+            return
+        self.handled.add(row_id)
+        while self.outstanding and self.outstanding[0] in self.handled:
+            self.handled.discard(self.outstanding.popleft())
+
+
+class IngestConsumer:
+    """Consumer of ingestion queue in the bot, which fans out queued records to feeds.
+
+    Records are acknowledged once every subscribed feed has handled them, so records
+    not delivered before stop are read again after restart. Records not handled by
+    a feed which was stopped without unsubscribing (on cog reload or failed restore)
+    are kept and replayed to the feed once it subscribes again, for ``feeds.catch-up`` seconds.
+    """
+
+    NAME = 'bot'
+
+    def __init__(self, config, queue: IngestQueue):
+        self.config = config
+        self.queue = queue
+        self.subscriptions: Dict[str, Set[QueueSubscription]] = {}
+        # The oldest not handled queue ID and stop time of stopped feeds by (channel ID, lowercase subreddit name)
+        self.orphaned: Dict[Tuple[int, str], Tuple[int, float]] = {}
+        self.read_id = 0
+        self.acked_id = 0
+        self._replays: Deque[QueueSubscription] = deque()
+        self._stop: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def outstanding(self) -> int:
+        return sum(len(sub) for subs in self.subscriptions.values() for sub in subs)
+
+    def subscribe(self, subreddit: str, channel_id: int) -> QueueSubscription:
+        """
+        Subscribes feed to queued records of subreddit.
+
+        Parameters
+        ----------
+        subreddit: :class:`str`
+            The Subreddit display name.
+        channel_id: :class:`int`
+            The feed's target Channel ID.
+        """
+        subscription = QueueSubscription((channel_id, subreddit.lower()))
+        self.subscriptions.setdefault(subreddit.lower(), set()).add(subscription)
+        if subscription.feed in self.orphaned:
+            self._replays.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subreddit: str, subscription: QueueSubscription, keep: bool = True) -> None:
+        """
+        Unsubscribes feed from queued records of subreddit.
+
+        Parameters
+        ----------
+        subreddit: :class:`str`
+            The Subreddit display name.
+        subscription: :class:`QueueSubscription`
+            The feed subscription.
+        keep: :class:`bool`
+            Whether to keep records not handled by the feed for its next subscription.
+        """
+        subscriptions = self.subscriptions.get(subreddit.lower())
+        if subscriptions is None or subscription not in subscriptions:
+            return
+        subscriptions.discard(subscription)
+        if not subscriptions:
+            del self.subscriptions[subreddit.lower()]
+
+        if keep:
+            # Records read after unsubscribing are kept too
+            self._orphan(subscription.feed, subscription.outstanding[0] if subscription.outstanding else self.read_id + 1)
+        else:
+            self.orphaned.pop(subscription.feed, None)
+
+    def hold(self, subreddit: str, channel_id: int) -> None:
+        """
+        Keeps records of subreddit for feed which failed to start, until it subscribes.
+
+        Parameters
+        ----------
+        subreddit: :class:`str`
+            The Subreddit display name.
+        channel_id: :class:`int`
+            The feed's target Channel ID.
+        """
+        self._orphan((channel_id, subreddit.lower()), self.read_id + 1)
+
+    def _orphan(self, feed: Tuple[int, str], oldest: int) -> None:
+        if feed in self.orphaned:
+            oldest = min(oldest, self.orphaned[feed][0])
+        self.orphaned[feed] = (oldest, time.time())
+
+    async def connect(self) -> None:
+        """Connects to queue."""
+        await self.queue.connect()
+
+    async def start(self) -> None:
+        """Starts reading queue after the acknowledged position."""
+        self.read_id = self.acked_id = await self.queue.acked(self.NAME)
+        # Feeds which failed to start before reading are held from the acknowledged position
+        for feed, (oldest, stopped_at) in self.orphaned.items():
+            self.orphaned[feed] = (max(oldest, self.acked_id + 1), stopped_at)
+        self._stop = asyncio.Event()
+        self._task = asyncio.create_task(self._run(), name='IngestConsumer')
+
+    async def _run(self) -> None:
+        settings = self.config['runtime']['ingestion']
+        while not self._stop.is_set():
+            rows = []
+            try:
+                await self.replay()
+                # Not reading more while feeds are busy, the rest stays in durable queue
+                if self.outstanding < settings['batch-size']:
+                    rows = await self.queue.fetch(self.read_id, settings['batch-size'])
+                for row_id, subreddit, record in rows:
+                    for subscription in self.subscriptions.get(subreddit.lower(), ()):
+                        subscription.put(row_id, record)
+                    self.read_id = row_id
+                await self.ack()
+            except Exception:
+                log.exception('Failed to consume ingestion queue')
+            if not rows:
+                try:
+                    await asyncio.wait_for(self._stop.wait(), settings['poll-interval'])
+                except asyncio.TimeoutError:
+                    pass
+
+    async def replay(self) -> None:
+        """Puts records kept for resubscribed feeds to their subscriptions."""
+        while self._replays:
+            subscription = self._replays[0]
+            orphaned = self.orphaned.get(subscription.feed)
+            if orphaned is not None:
+                rows = await self.queue.fetch_subreddit(subscription.feed[1], orphaned[0] - 1, self.read_id)
+                for row_id, record in rows:
+                    subscription.put(row_id, record)
+                del self.orphaned[subscription.feed]
+            self._replays.popleft()
+
+    async def ack(self) -> None:
+        """Acknowledges records handled by every subscribed feed and not kept for stopped feeds."""
+        expired = time.time() - self.config['feeds']['catch-up']
+        for feed, (_, stopped_at) in list(self.orphaned.items()):
+            if stopped_at < expired:
+                del self.orphaned[feed]
+
+        acked_id = self.read_id
+        for subscriptions in self.subscriptions.values():
+            for subscription in subscriptions:
+                if subscription.outstanding:
+                    acked_id = min(acked_id, subscription.outstanding[0] - 1)
+        for oldest, _ in self.orphaned.values():
+            acked_id = min(acked_id, oldest - 1)
+
+        if acked_id > self.acked_id:
+            await self.queue.ack(self.NAME, acked_id)
+            self.acked_id = acked_id
+
+    async def close(self) -> None:
+        """Stops reading queue, acknowledges handled records and closes queue."""
+        if self._task is not None:
+            # Stopping between reads, so queue is not closed in the middle of one
+            self._stop.set()
+            await self._task
+            self._task = None
+        try:
+            await self.ack()
+        except Exception:
+            log.exception('Failed to acknowledge ingestion queue')
+        await self.queue.close()
@@ -0,0 +1,74 @@
+from collections import OrderedDict
+from typing import Callable, List, Optional
+import asyncpraw
+
+from bot.utils.records import SubmissionRecord
+
+
+class ListingPoller:
+    """Polls new submissions of Subreddit listing without asyncpraw object model.
+
+    Listing JSON is requested through the authenticated Reddit client session, and
+    fullnames of listing children are checked against seen set before anything is
+    built, so only unseen submissions are turned into records. Polling follows
+    asyncpraw stream generator: up to 100 children, ``before`` the newest seen one,
+    yielded oldest first, with 301 remembered fullnames.
+    """
+
+    SEEN_LIMIT = 301
+
+    def __init__(
+        self,
+        reddit: asyncpraw.Reddit,
+        subreddit: str,
+        text_limit: Callable[[], int],
+        listing: str = 'new',
+        skip_existing: bool = True
+    ):
+        self.reddit = reddit
+        self.subreddit = subreddit
+        self.listing = listing
+        self.text_limit = text_limit
+        self.skip_existing = skip_existing
+        self._seen: OrderedDict[str, None] = OrderedDict()
+        self._before: Optional[str] = None
+        self._without_before_counter = 0
+
+    def _add_seen(self, fullname: str) -> None:
+        self._seen[fullname] = None
+        if len(self._seen) > self.SEEN_LIMIT:
+            self._seen.popitem(last=False)
+
+    async def poll(self) -> List[SubmissionRecord]:
+        """Requests listing once and returns unseen submissions, oldest first."""
+        limit = 100
+        params = {}
+        if self._before is None:
+            # Varying limit to bypass Reddit cache, as stream generator does
+            limit -= self._without_before_counter
+            self._without_before_counter = (self._without_before_counter + 1) % 30
+        else:
+            params['before'] = self._before
+        params['limit'] = limit
+
+        data = await self.reddit.request(method='GET', path=f'r/{self.subreddit}/{self.listing}', params=params)
+
+        records = []
+        newest = None
+        for child in reversed(data['data']['children']):
+            if child['kind'] != 't3':
+                continue
+
+            fullname = child['data']['name']
+            if fullname in self._seen:
+                self._seen.move_to_end(fullname)
+                continue
+            self._add_seen(fullname)
+            newest = fullname
+
+            if not self.skip_existing:
+                records.append(SubmissionRecord.from_data(child['data'], self.text_limit()))
+
+        self._before = newest
+        self.skip_existing = False
+        return records
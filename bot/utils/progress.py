@@ -0,0 +1,163 @@
+import logging
+import asyncio
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Set, Tuple
+
+from bot.utils.records import SubmissionRecord
+
+log = logging.getLogger(__name__)
+
+
+class FeedProgress:
+    """Delivery progress of one feed, which advances its checkpoint over handled submissions only.
+
+    Submissions are tracked in the order they are fed. The checkpoint is the creation time
+    of the newest submission which is handled together with every submission fed before it,
+    so it never passes a submission being sent or held by delivery caps.
+    """
+
+    __slots__ = ('checkpoint', '_outstanding', '_handled')
+
+    def __init__(self, checkpoint: float = 0.0):
+        self.checkpoint = checkpoint
+        # Submissions fed but not handled yet by submission ID, in fed order
+        self._outstanding: OrderedDict[str, Tuple[float, Optional[Callable[[], None]]]] = OrderedDict()
+        self._handled: Set[str] = set()
+
+    def __len__(self) -> int:
+        return len(self._outstanding)
+
+    def track(self, record: SubmissionRecord, callback: Optional[Callable[[], None]] = None) -> None:
+        """
+        Tracks fed submission until it's handled.
+
+        Parameters
+        ----------
+        record: :class:`SubmissionRecord`
+            The fed submission.
+        callback: Optional[Callable[[], None]]
+            The function called once the submission is handled.
+        """
+        self._outstanding[record.id] = (record.created_utc, callback)
+
+    def done(self, submission_id: str) -> bool:
+        """
+        Marks submission as handled: delivered, failed to send or skipped on purpose.
+
+        Returns whether the checkpoint was advanced.
+
+        Parameters
+        ----------
+        submission_id: :class:`str`
+            The handled Submission ID.
+        """
+        entry = self._outstanding.get(submission_id)
+        if entry is None or submission_id in self._handled:
+            return False
+        self._handled.add(submission_id)
+        if entry[1] is not None:
+            entry[1]()
+
+        advanced = False
+        while self._outstanding:
+            submission_id = next(iter(self._outstanding))
+            if submission_id not in self._handled:
+                break
+            created_utc, _ = self._outstanding.popitem(last=False)[1]
+            self._handled.discard(submission_id)
+            if created_utc > self.checkpoint:
+                self.checkpoint = created_utc
+                advanced = True
+        return advanced
+
+
+class CheckpointStore:
+    """Feed checkpoints by (channel ID, subreddit name), written to database by periodic writer.
+
+    Checkpoints changed since the last write are written every ``feeds.checkpoint-interval``
+    seconds and on shutdown, so after a crash feeds resume from checkpoints at most one
+    interval old instead of ones written on the last graceful shutdown.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self._checkpoints: Dict[Tuple[int, str], float] = {}
+        self._changed: Set[Tuple[int, str]] = set()
+        self._removed: Set[Tuple[int, str]] = set()
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._checkpoints)
+
+    def get(self, key: Tuple[int, str], default: float = 0.0) -> float:
+        return self._checkpoints.get(key, default)
+
+    def __setitem__(self, key: Tuple[int, str], checkpoint: float) -> None:
+        self._checkpoints[key] = checkpoint
+        self._changed.add(key)
+        self._removed.discard(key)
+
+    def pop(self, key: Tuple[int, str]) -> Optional[float]:
+        """Drops checkpoint of stopped feed, it's deleted from database on next write."""
+        self._changed.discard(key)
+        self._removed.add(key)
+        return self._checkpoints.pop(key, None)
+
+    async def load(self) -> Dict[Tuple[int, str], float]:
+        """Returns checkpoints saved in database by (channel ID, subreddit name)."""
+        rows = await self.bot.database.fetch_all('SELECT channel_id, subreddit, created_utc FROM checkpoints')
+        return {(row['channel_id'], row['subreddit']): row['created_utc'] for row in rows}
+
+    def start(self) -> None:
+        """Starts periodic writer, must be called after database is connected."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name='CheckpointStore')
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.bot.config['feeds']['checkpoint-interval'])
+            try:
+                await self.flush()
+            except Exception:
+                log.exception('Failed to write feed checkpoints')
+
+    async def close(self) -> None:
+        """Stops periodic writer and writes changed checkpoints."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        try:
+            await self.flush()
+        except Exception:
+            log.exception('Failed to write feed checkpoints')
+
+    async def flush(self) -> int:
+        """Writes checkpoints changed since the last write to database and returns their count."""
+        changed, self._changed = self._changed, set()
+        removed, self._removed = self._removed, set()
+        rows = [
+            {'channel_id': channel_id, 'subreddit': subreddit, 'created_utc': self._checkpoints[(channel_id, subreddit)]}
+            for channel_id, subreddit in changed
+        ]
+        if not rows and not removed:
+            return 0
+
+        try:
+            async with self.bot.database.transaction():
+                if rows:
+                    await self.bot.database.execute_many(
+                        'INSERT OR REPLACE INTO checkpoints (channel_id, subreddit, created_utc) '
+                        'VALUES (:channel_id, :subreddit, :created_utc)',
+                        rows
+                    )
+                if removed:
+                    await self.bot.database.execute_many(
+                        'DELETE FROM checkpoints WHERE channel_id = :channel_id AND subreddit = :subreddit',
+                        [{'channel_id': channel_id, 'subreddit': subreddit} for channel_id, subreddit in removed]
+                    )
+        except BaseException:
+            # Not written checkpoints are written on next flush, unless the feed was stopped or resubscribed meanwhile
+            self._changed |= {key for key in changed if key in self._checkpoints}
+            self._removed |= {key for key in removed if key not in self._checkpoints}
+            raise
+        return len(rows)
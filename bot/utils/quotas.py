@@ -0,0 +1,128 @@
+import time
+from typing import Any, Dict, List
+
+
+class GuildUsage:
+    """Usage counters of one guild."""
+
+    __slots__ = ('hour', 'messages', 'delivered', 'throttled')
+
+    def __init__(self):
+        # Messages are counted in fixed clock hour windows
+        self.hour = 0
+        self.messages = 0
+        self.delivered = 0
+        self.throttled = 0
+
+    def current(self, hour: int) -> int:
+        if self.hour != hour:
+            self.hour = hour
+            self.messages = 0
+        return self.messages
+
+
+class GuildQuotas:
+    """Per-guild quotas of feeds and delivered messages per hour by configured tier.
+
+    The default tier takes its limits from ``limits.feeders-limit`` and
+    ``limits.messages-per-hour``, other tiers are defined in ``limits.tiers``
+    and assigned to guilds by ``limits.guild-tiers``.
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self.usage: Dict[int, GuildUsage] = {}
+
+    def tier(self, guild_id: int) -> str:
+        """Returns tier name of the guild."""
+        return self.config['limits']['guild-tiers'].get(guild_id, 'default')
+
+    def limits(self, guild_id: int) -> Dict[str, int]:
+        """
+        Returns quotas of the guild tier: ``feeds``, ``messages-per-hour`` (0 is unlimited) and ``weight``.
+
+        Parameters
+        ----------
+        guild_id: :class:`int`
+            The Guild ID.
+        """
+        limits = self.config['limits']
+        default = {
+            'feeds': limits['feeders-limit'],
+            'messages-per-hour': limits['messages-per-hour'],
+            'weight': 1
+        }
+        return {**default, **limits['tiers'].get(self.tier(guild_id), {})}
+
+    def weight(self, guild_id: int) -> int:
+        """Returns share of delivery scheduling of the guild."""
+        return self.limits(guild_id)['weight']
+
+    def _usage(self, guild_id: int) -> GuildUsage:
+        usage = self.usage.get(guild_id)
+        if usage is None:
+            usage = self.usage[guild_id] = GuildUsage()
+        return usage
+
+    def can_deliver(self, guild_id: int) -> bool:
+        """
+        Returns whether the guild has messages quota left in current hour, counts throttled submission if not.
+
+        Parameters
+        ----------
+        guild_id: :class:`int`
+            The Guild ID.
+        """
+        limit = self.limits(guild_id)['messages-per-hour']
+        if limit == 0:
+            return True
+
+        usage = self._usage(guild_id)
+        if usage.current(int(time.time()) // 3600) < limit:
+            return True
+        usage.throttled += 1
+        return False
+
+    def delivered(self, guild_id: int) -> None:
+        """
+        Counts delivered message of the guild.
+
+        Parameters
+        ----------
+        guild_id: :class:`int`
+            The Guild ID.
+        """
+        usage = self._usage(guild_id)
+        usage.current(int(time.time()) // 3600)
+        usage.messages += 1
+        usage.delivered += 1
+
+    def report(self, feeds: Dict[int, int], pending: Dict[int, int]) -> List[Dict[str, Any]]:
+        """
+        Returns usage of guilds with feeds or deliveries, heaviest first.
+
+        Parameters
+        ----------
+        feeds: Dict[:class:`int`, :class:`int`]
+            The count of running feeds by Guild ID.
+        pending: Dict[:class:`int`, :class:`int`]
+            The count of scheduled sends by Guild ID.
+        """
+        hour = int(time.time()) // 3600
+        result = []
+        for guild_id in feeds.keys() | self.usage.keys() | pending.keys():
+            usage = self._usage(guild_id)
+            limits = self.limits(guild_id)
+            result.append({
+                'guild_id': guild_id,
+                'tier': self.tier(guild_id),
+                'feeds': feeds.get(guild_id, 0),
+                'feeds_limit': limits['feeds'],
+                'messages': usage.current(hour),
+                'messages_limit': limits['messages-per-hour'],
+                'delivered': usage.delivered,
+                'throttled': usage.throttled,
+                'pending': pending.get(guild_id, 0)
+            })
+        result.sort(key=lambda item: (item['messages'], item['feeds'], item['delivered']), reverse=True)
+        return result
@@ -0,0 +1,191 @@
+from typing import Any, Dict, Optional, Tuple
+from asyncpraw import models
+
+from bot.utils.formatting import POLL_LINK, selftext_bound
+
+# Maximum count of gallery images embedded to message
+GALLERY_LIMIT = 3
+
+
+def _gallery(gallery_data: Optional[Dict[str, Any]], media_metadata: Optional[Dict[str, Any]]) -> Tuple[Tuple[str, Optional[str]], ...]:
+    if not gallery_data or not media_metadata:
+        return ()
+
+    items = []
+    for data in gallery_data['items']:
+        # If had reached embeds limit
+        if len(items) >= GALLERY_LIMIT:
+            break
+
+        media = media_metadata.get(data['media_id'])
+
+        # If media is not valid, skipping it
+        if not media or media['status'] != 'valid':
+            continue
+
+        # If media is image...
+        if media['e'] == 'Image':
+            items.append((media['s']['u'], data.get('caption')))
+        # If media is gif/video...
+        elif media['e'] == 'AnimatedImage':
+            items.append((media['s']['gif'], data.get('caption')))
+
+    return tuple(items)
+
+
+def _media(secure_media: Optional[Dict[str, Any]]) -> Optional[str]:
+    if not secure_media:
+        return None
+    if 'reddit_video' in secure_media:
+        return 'video'
+    if 'oembed' in secure_media:
+        return 'embed'
+    return None
+
+
+def _selftext(selftext: str, text_limit: int, is_poll: bool) -> str:
+    if is_poll:
+        match = POLL_LINK.search(selftext, max(0, len(selftext) - 128))
+        if match:
+            selftext = selftext[:match.start()]
+
+    # Keeping one character over the bound, so formatter knows the text was cut
+    return selftext[:selftext_bound(text_limit) + 1]
+
+
+class SubmissionRecord:
+    """Compact submission data which is used for rendering feed messages.
+
+    Holds only rendered fields, with selftext cut to bounded prefix,
+    so the original submission model with its raw data can be dropped right away.
+    """
+
+    __slots__ = (
+        'id',
+        'subreddit',
+        'author',
+        'permalink',
+        'title',
+        'flair',
+        'selftext',
+        'url',
+        'spoiler',
+        'over_18',
+        'is_poll',
+        'media',
+        'gallery',
+        'created_utc'
+    )
+
+    def __init__(
+        self,
+        id: str,
+        subreddit: str,
+        author: str,
+        permalink: str,
+        title: str,
+        flair: Optional[str],
+        selftext: str,
+        url: str,
+        spoiler: bool,
+        over_18: bool,
+        is_poll: bool,
+        media: Optional[str],
+        gallery: Tuple[Tuple[str, Optional[str]], ...],
+        created_utc: float
+    ):
+        self.id = id
+        self.subreddit = subreddit
+        self.author = author
+        self.permalink = permalink
+        self.title = title
+        self.flair = flair
+        self.selftext = selftext
+        self.url = url
+        self.spoiler = spoiler
+        self.over_18 = over_18
+        self.is_poll = is_poll
+        self.media = media
+        self.gallery = gallery
+        self.created_utc = created_utc
+
+    def __repr__(self) -> str:
+        return f'<SubmissionRecord id={self.id!r} subreddit={self.subreddit!r}>'
+
+    @classmethod
+    def from_submission(cls, sm: models.Submission, text_limit: int) -> 'SubmissionRecord':
+        """
+        Creates record from asyncpraw submission model.
+
+        Parameters
+        ----------
+        sm: :class:`asyncpraw.models.Submission`
+            The submission model.
+        text_limit: :class:`int`
+            The maximum count of selftext characters to render.
+        """
+        is_poll = hasattr(sm, 'poll_data')
+        return cls(
+            id=sm.id,
+            subreddit=sm.subreddit.display_name,
+            author=sm.author.name if sm.author else '[deleted]',
+            permalink=sm.permalink,
+            title=sm.title,
+            flair=sm.link_flair_text or None,
+            selftext=_selftext(sm.selftext, text_limit, is_poll),
+            url=sm.url,
+            spoiler=sm.spoiler,
+            over_18=sm.over_18,
+            is_poll=is_poll,
+            media=_media(getattr(sm, 'secure_media', None)),
+            gallery=_gallery(getattr(sm, 'gallery_data', None), getattr(sm, 'media_metadata', None)),
+            created_utc=sm.created_utc
+        )
+
+    @classmethod
+    def from_data(cls, data: Dict[str, Any], text_limit: int) -> 'SubmissionRecord':
+        """
+        Creates record from raw submission data of listing JSON.
+
+        Gives the same record as :meth:`from_submission` for the model built from the data.
+
+        Parameters
+        ----------
+        data: :class:`dict`
+            The ``data`` of listing child of ``t3`` kind.
+        text_limit: :class:`int`
+            The maximum count of selftext characters to render.
+        """
+        is_poll = 'poll_data' in data
+        return cls(
+            id=data['id'],
+            subreddit=data['subreddit'],
+            author=data.get('author') or '[deleted]',
+            permalink=data['permalink'],
+            title=data['title'],
+            flair=data.get('link_flair_text') or None,
+            selftext=_selftext(data['selftext'], text_limit, is_poll),
+            url=data['url'],
+            spoiler=data['spoiler'],
+            over_18=data['over_18'],
+            is_poll=is_poll,
+            media=_media(data.get('secure_media')),
+            gallery=_gallery(data.get('gallery_data'), data.get('media_metadata')),
+            created_utc=data['created_utc']
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Returns JSON serializable dictionary of the record."""
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'SubmissionRecord':
+        """
+        Creates record from dictionary made by :meth:`to_dict`.
+
+        Parameters
+        ----------
+        data: :class:`dict`
+            The record dictionary, possibly loaded from JSON.
+        """
+        return cls(**{**data, 'gallery': tuple((url, caption) for url, caption in data['gallery'])})
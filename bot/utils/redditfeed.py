@@ -1,7 +1,9 @@
 import logging
-import yaml
-from typing import Dict, Set
-import re
+import random
+import functools
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Set, Tuple
+from collections import OrderedDict
+import time
 import asyncio
 import asyncprawcore
 import asyncpraw
@@ -11,6 +13,17 @@ from disnake.ext import commands
 from disnake.utils import escape_markdown
 
 from bot.utils import exceptions
+from bot.utils.channelstate import ChannelState, ChannelStateCache
+from bot.utils.delivery import DeliveryGate, FairScheduler
+from bot.utils.formatting import CONTENT_LIMIT, FOOTER_LIMIT, fit_content, format_selftext
+from bot.utils.httppool import HTTPPool, json_parser, requestor_options
+from bot.utils.ingest import IngestConsumer, IngestQueue
+from bot.utils.listing import ListingPoller
+from bot.utils.progress import CheckpointStore, FeedProgress
+from bot.utils.quotas import GuildQuotas
+from bot.utils.records import SubmissionRecord
+from bot.utils.snapshot import ListingWatcher
+from bot.utils.subredditindex import SubredditIndex
 
 log = logging.getLogger(__name__)
 
@@ -18,19 +31,105 @@ log = logging.getLogger(__name__)
 class RedditFeed:
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        with open('config.yml', 'r') as fp:
-            self.config = yaml.safe_load(fp)
-        self.text_limit = self.bot.config['text_limit']
+        self.config = self.bot.config
         self.feeders: Dict[int, Set[asyncio.Task]] = {}
-        self.reddit = asyncpraw.Reddit(
+        # Creation time of the newest handled submission by (channel ID, subreddit name),
+        # submissions fed before it are handled too
+        self.checkpoints = CheckpointStore(bot)
+        # Delivery progress of new submissions feeds by (channel ID, subreddit name)
+        self.progress: Dict[Tuple[int, str], FeedProgress] = {}
+        # Messages being sent, kept for draining on shutdown
+        self.deliveries: Set[asyncio.Future] = set()
+        self.gate = DeliveryGate(self)
+        self.quotas = GuildQuotas(self.config)
+        self.scheduler = FairScheduler(self.config['delivery']['concurrency'], self.quotas.weight)
+        self.channels = ChannelStateCache(bot)
+        # Shared ranked listing watchers by (lowercase subreddit name, feed kind)
+        self.watchers: Dict[Tuple[str, str], ListingWatcher] = {}
+        self.stopping = False
+        self.subreddit_index = SubredditIndex()
+        self.lookup_debounce = 0.5
+        self.lookup_ttl = 3600.0
+        self._lookup_cache: OrderedDict[str, float] = OrderedDict()
+        self._lookup_pending: Dict[int, asyncio.Task] = {}
+        # Reddit client and optional shared HTTP pool are created by connect() in running loop
+        self.http: Optional[HTTPPool] = None
+        self.reddit: Optional[asyncpraw.Reddit] = None
+        # Incremented on every Reddit client replacement, feeders follow it on next poll
+        self.reddit_generation = 0
+        # Consumer of ingestion queue, new submissions are polled by ingestion worker in queue mode
+        self.ingest: Optional[IngestConsumer] = None
+        self.config.add_listener(self._on_config_reload)
+
+    @property
+    def text_limit(self) -> int:
+        return self.config['limits']['text-limit']
+
+    async def connect(self) -> None:
+        """Creates Reddit client, using shared HTTP pool if enabled in configuration."""
+        pool = self.config['runtime']['http-pool']
+        if pool['enabled'] and self.http is None:
+            self.http = HTTPPool(
+                limit=pool['limit'],
+                limit_per_host=pool['limit-per-host'],
+                keepalive_timeout=pool['keepalive-timeout'],
+                dns_cache_ttl=pool['dns-cache-ttl']
+            )
+            log.info(f'Using shared HTTP pool for Reddit (limit: {pool["limit"]}, per host: {pool["limit-per-host"]})')
+
+        if self.reddit is None:
+            self.reddit = self._create_reddit()
+            log.info(f'Parsing Reddit responses with {json_parser()}')
+
+        ingestion = self.config['runtime']['ingestion']
+        if ingestion['mode'] == 'queue' and self.ingest is None:
+            self.ingest = IngestConsumer(self.config, IngestQueue(ingestion['queue-path']))
+            await self.ingest.connect()
+            self.bot.loop.create_task(self._start_ingest())
+            log.info(f'Consuming new submissions from ingestion queue {ingestion["queue-path"]}')
+
+    async def _start_ingest(self) -> None:
+        # Reading queue once restored feeds are subscribed, so their records are not skipped
+        await self.bot.startup.wait('feeds')
+        await self.ingest.start()
+
+    def _create_reddit(self) -> asyncpraw.Reddit:
+        kwargs = requestor_options(self.http.session if self.http is not None else None)
+        return asyncpraw.Reddit(
             client_id=self.config['reddit']['client-id'],
             client_secret=self.config['reddit']['client-secret'],
-            password=self.config['reddit']['password'],
+            password=self.config['reddit'].get('password'),
             user_agent=self.config['reddit']['user-agent'],
-            username=self.config['reddit']['username']
+            username=self.config['reddit'].get('username'),
+            **kwargs
         )
 
-    async def feed_start(self, subreddit_name: str, channel_id: int):
+    def _on_config_reload(self, changed: Set[str]) -> None:
+        if self.reddit is None or not any(key.startswith('reddit.') for key in changed):
+            return
+
+        # Replacing Reddit client, running feeders switch to it on their next poll
+        old_reddit = self.reddit
+        self.reddit = self._create_reddit()
+        self.reddit_generation += 1
+        self.bot.loop.create_task(self._close_reddit(old_reddit))
+        log.info('Reddit client was replaced by reloaded credentials')
+
+    async def _close_reddit(self, reddit: asyncpraw.Reddit) -> None:
+        # Giving time to feeders for switching to new client
+        await asyncio.sleep(self.config['feeds']['poll-max-delay'] * 2 + 30)
+        await reddit.close()
+
+    async def feed_start(
+        self,
+        subreddit_name: str,
+        channel_id: int,
+        checkpoint: float = 0.0,
+        kind: str = 'new',
+        max_rank: Optional[int] = None,
+        min_score: Optional[int] = None,
+        check_quota: bool = True
+    ):
         """
         Starts subreddit feed to server's channel.
 
@@ -40,12 +139,26 @@ class RedditFeed:
             The Subreddit name to feeding.
         channel_id: :class:`int`
             The Guild's target Channel ID for posting submissions.
+        checkpoint: :class:`float`
+            The creation time of the newest submission fed before restart.
+            Newer submissions are fed on start instead of skipping them.
+        kind: :class:`str`
+            The feed kind: ``new`` feeds every new submission, ``hot``, ``rising`` and ``top``
+            feed submissions which newly reach ``max_rank`` with at least ``min_score``.
+        max_rank: Optional[:class:`int`]
+            The maximum rank in listing of ranked feed, ``feeds.ranked-max-rank`` if not given.
+        min_score: Optional[:class:`int`]
+            The minimum score of submissions of ranked feed.
+        check_quota: :class:`bool`
+            Whether to check feeds quota of the guild, restored feeds are not checked.
         """
-        channel = self.bot.get_channel(channel_id)
+        state = self.channels.get(channel_id)
+        if state.channel is None:
+            raise exceptions.ChannelNotFound(channel_id)
+        channel = state.channel
 
         # Checking channel permissions
-        bot_user = channel.guild.get_member(self.bot.user.id)
-        if channel.permissions_for(bot_user).send_messages is False:
+        if not state.can_send:
             raise exceptions.CannotSendMessages()
 
         # If don't have guild task list in dict, make new collection
@@ -57,7 +170,12 @@ class RedditFeed:
                 if task.subreddit.lower() == subreddit_name.lower() and task.channel == channel.id:
                     raise exceptions.FeedExists()
 
+        feeds_limit = self.quotas.limits(channel.guild.id)['feeds']
+        if check_quota and len(self.feeders[channel.guild.id]) >= feeds_limit:
+            raise exceptions.FeedQuotaExceeded(feeds_limit)
+
         # Searching subreddit by name
+        self.bot.activity.reddit_call()
         subreddits = self.reddit.subreddits.search_by_name(subreddit_name, exact=True)
         try:
             async for sr in subreddits:
@@ -66,6 +184,7 @@ class RedditFeed:
             raise exceptions.SubredditNotFound(subreddit_name)
 
         # Checking for subreddit access
+        self.bot.activity.reddit_call()
         try:
             await subreddit.load()
         except asyncprawcore.exceptions.Forbidden:
@@ -74,23 +193,44 @@ class RedditFeed:
             raise exceptions.SubredditNotFound(subreddit_name)
 
         # If subreddit is NSFW but channel not NSFW marked
-        if subreddit.over18 and not channel.is_nsfw():
+        if subreddit.over18 and not state.nsfw:
             raise exceptions.SubredditIsNSFW(subreddit_name)
 
+        # Resuming from checkpoint if it's not too old
+        checkpoint = max(checkpoint, self.checkpoints.get((channel.id, subreddit.display_name), 0.0))
+        if checkpoint < time.time() - self.config['feeds']['catch-up']:
+            checkpoint = 0.0
+
         # Creating task for feeding
-        task = self.bot.loop.create_task(
-            self.subreddit_feeder(subreddit, channel),
-            name=f'RedditFeed_{channel.id}_{subreddit.display_name}'
-        )
+        if kind == 'new' and self.ingest is not None:
+            coro = self.queued_feeder(subreddit.display_name, channel, checkpoint)
+        elif kind == 'new':
+            coro = self.subreddit_feeder(subreddit, channel, checkpoint)
+        else:
+            if max_rank is None:
+                max_rank = self.config['feeds']['ranked-max-rank']
+            coro = self.ranked_feeder(subreddit.display_name, channel, kind, max_rank, min_score or 0)
+        task = self.bot.loop.create_task(coro, name=f'RedditFeed_{channel.id}_{subreddit.display_name}')
         task.subreddit = subreddit.display_name
         task.channel = channel.id
+        task.guild = channel.guild.id
+        task.kind = kind
 
         # Adding the link to asyncio task to collection
         self.feeders[channel.guild.id].add(task)
-        task.add_done_callback(self.feeders[channel.guild.id].discard)
+        task.add_done_callback(self._on_feeder_done)
+
+        # Keeping subreddit name in autocomplete index while feeding
+        self.subreddit_index.pin(subreddit.display_name)
+        self.bot.stats.feed_started(channel.guild.id)
 
         return subreddit.display_name
 
+    def _on_feeder_done(self, task: asyncio.Task) -> None:
+        self.feeders[task.guild].discard(task)
+        self.subreddit_index.unpin(task.subreddit)
+        self.bot.stats.feed_stopped(task.guild)
+
     def feed_stop(self, subreddit_name: str, guild_id: int, channel_id: int) -> bool:
         """
         Stops subreddit feeding for server's channel.
@@ -111,112 +251,466 @@ class RedditFeed:
             if task_subreddit == subreddit_name.lower() and task_channel == channel_id:
                 task.cancel('Stopped feeding')
                 self.feeders[guild_id].remove(task)
+                self.checkpoints.pop((channel_id, task.subreddit), None)
+                self.progress.pop((channel_id, task.subreddit), None)
                 return task.subreddit
             continue
         return False
 
-    def feed_stop_all(self) -> None:
-        """Stops every subreddit feeding."""
-        for guild_id in self.feeders:
-            for task in self.feeders[guild_id]:
-                task.cancel('Stopped feeding')
-                self.feeders[guild_id].remove(task)
+    def feed_stop_all(self) -> List[asyncio.Task]:
+        """
+        Stops every subreddit feeding.
+
+        Messages being sent are not cancelled, checkpoints and delivery progress are kept for resuming.
+        Returns list of stopped tasks.
+        """
+        tasks = []
+        for guild_tasks in self.feeders.values():
+            tasks.extend(guild_tasks)
+            guild_tasks.clear()
+
+        for task in tasks:
+            task.cancel('Stopped feeding')
+        return tasks
+
+    async def shutdown(self, timeout: float) -> None:
+        """
+        Stops feeding gracefully.
+
+        Ingestion queue is acknowledged and polling is stopped first, then submissions held by
+        delivery caps are sent and messages being sent are drained with deadline, then checkpoints
+        are written to database and Reddit client is closed.
+
+        Parameters
+        ----------
+        timeout: :class:`float`
+            The deadline in seconds for draining messages being sent.
+        """
+        if self.stopping:
+            return
+        self.stopping = True
+
+        # Records being delivered are not acknowledged, they are filtered by checkpoints after restart
+        if self.ingest is not None:
+            await self.ingest.close()
+
+        tasks = self.feed_stop_all()
+        for task in self._lookup_pending.values():
+            task.cancel()
+        if tasks:
+            await asyncio.wait(tasks)
+        log.info(f'Stopped {len(tasks)} feeds')
+
+        held = self.gate.stop()
+        if held:
+            log.info(f'Sending {held} submissions held by delivery caps')
+
+        if self.deliveries:
+            log.info(f'Draining {len(self.deliveries)} messages being sent...')
+            _, pending = await asyncio.wait(set(self.deliveries), timeout=timeout)
+            if pending:
+                log.warning(f'{len(pending)} messages were not sent in {timeout} seconds, cancelling')
+                for delivery in pending:
+                    delivery.cancel()
+        self.scheduler.stop()
+
+        if self.bot.database.is_connected:
+            await self.checkpoints.close()
+
+        if self.reddit is not None:
+            await self.reddit.close()
+        if self.http is not None:
+            await self.http.close()
+
+    def lookup_subreddits(self, query: str, user_id: int) -> None:
+        """
+        Schedules debounced Reddit search of Subreddit names to fill autocomplete index.
+
+        Pending search of the same user is replaced on every call, so only the last
+        typed query is sent to Reddit. Recently searched queries are not sent again.
+
+        Parameters
+        ----------
+        query: :class:`str`
+            The Subreddit name prefix to search.
+        user_id: :class:`int`
+            The User ID which typing the query.
+        """
+        query = query.strip().lower()
+        if len(query) < 2:
+            return
+
+        expires = self._lookup_cache.get(query)
+        if expires is not None and expires > time.monotonic():
+            return
+
+        pending = self._lookup_pending.get(user_id)
+        if pending is not None:
+            pending.cancel()
+
+        task = self.bot.loop.create_task(self._lookup_subreddits(query), name=f'RedditFeed_Lookup_{user_id}')
+        self._lookup_pending[user_id] = task
+        task.add_done_callback(
+            lambda t: self._lookup_pending.pop(user_id) if self._lookup_pending.get(user_id) is t else None
+        )
+
+    async def _lookup_subreddits(self, query: str) -> None:
+        await asyncio.sleep(self.lookup_debounce)
+        # Once sent, the search is not cancelled by newer queries
+        await asyncio.shield(self._search_subreddits(query))
+
+    async def _search_subreddits(self, query: str) -> None:
+        self._lookup_cache[query] = time.monotonic() + self.lookup_ttl
+        self._lookup_cache.move_to_end(query)
+        while len(self._lookup_cache) > 1000:
+            self._lookup_cache.popitem(last=False)
+
+        self.bot.activity.reddit_call()
+        try:
+            async for sr in self.reddit.subreddits.search_by_name(query):
+                self.subreddit_index.add(sr.display_name)
+        except Exception as e:
+            self._lookup_cache.pop(query, None)
+            log.warning(f'Failed to search subreddits by "{query}": {e}')
+
+    def render_submission(self, record: SubmissionRecord, state: ChannelState) -> Optional[Dict[str, Any]]:
+        """
+        Renders submission to keyword arguments of :meth:`disnake.abc.Messageable.send`.
+
+        Returns ``None`` if the submission should not be sent to the channel.
+
+        Parameters
+        ----------
+        record: :class:`SubmissionRecord`
+            The submission to render.
+        state: :class:`ChannelState`
+            The target channel state of the submission.
+        """
+        view = disnake.ui.View()
+        embeds = []
+
+        if record.is_poll:
+            content = f'*Poll on `r/{record.subreddit}` by `u/{record.author}`*'
+            view.add_item(disnake.ui.Button(label='View Poll', url=f'https://reddit.com{record.permalink}'))
+        else:
+            content = f'*Submission on `r/{record.subreddit}` by `u/{record.author}`*'
+            view.add_item(disnake.ui.Button(label='View Submission', url=f'https://reddit.com{record.permalink}'))
+
+        if record.flair:
+            content += f' **[{escape_markdown(record.flair)}]**'
+
+        if record.spoiler:
+            content += ' **[Spoiler]**'
+
+        if record.over_18:
+            if state.nsfw:
+                content += ' **[NSFW]**'
+            else:
+                # Ignoring submission which channel is not NSFW marked
+                return None
+
+        content += f'\n**{escape_markdown(record.title)}**'
+
+        attachment = ''
+        if not state.can_embed:
+            # Without embed links permission images are not shown, so only marking them
+            if record.url.endswith(('.jpg', '.png', '.gif')) or record.gallery:
+                attachment = '\n*[Image Attachment]*'
+            elif record.media == 'video':
+                attachment = '\n*[Video Attachment]*'
+            elif record.media == 'embed':
+                attachment = '\n*[Embed Attachment]*'
+        elif record.url.endswith(('.jpg', '.png', '.gif')):
+            embed = disnake.Embed(colour=0xff5700, type='image')
+            embed.set_image(url=record.url)
+            embeds.append(embed)
+        elif record.media == 'video':
+            attachment = '\n*[Video Attachment]*'
+        elif record.media == 'embed':
+            attachment = '\n*[Embed Attachment]*'
+        else:
+            for url, caption in record.gallery:
+                embed = disnake.Embed(colour=0xff5700, type='image')
+                embed.set_image(url=url)
+                if caption:
+                    embed.set_footer(text=fit_content(caption, FOOTER_LIMIT))
+                embeds.append(embed)
+
+        # Selftext takes the rest of message length left from header and attachment
+        selftext = format_selftext(
+            record.selftext,
+            self.text_limit,
+            CONTENT_LIMIT - len(content) - len(attachment) - 2,
+            spoiler=record.spoiler,
+            poll=record.is_poll
+        )
+        if selftext:
+            content += f'\n\n{selftext}'
+        content += attachment
+
+        return {'content': fit_content(content), 'embeds': embeds, 'view': view}
+
+    def handled(self, channel_id: int, records: Sequence[SubmissionRecord]) -> None:
+        """
+        Marks submissions as handled by feed of the channel, advancing its checkpoint.
+
+        Parameters
+        ----------
+        channel_id: :class:`int`
+            The target Channel ID.
+        records: Sequence[:class:`SubmissionRecord`]
+            The handled submissions.
+        """
+        for record in records:
+            key = (channel_id, record.subreddit)
+            progress = self.progress.get(key)
+            if progress is not None and progress.done(record.id):
+                self.checkpoints[key] = progress.checkpoint
+
+    async def dispatch(self, channel_id: int, record: SubmissionRecord) -> None:
+        """
+        Renders submission and submits it for delivery to the channel.
+
+        Submissions are skipped without rendering while the channel is not found,
+        bot can't send messages to it or the thread is archived, and while
+        the guild has no messages quota left in current hour. Skipped submissions
+        are handled at once, submitted ones once they are sent or shed by delivery caps.
+
+        Parameters
+        ----------
+        channel_id: :class:`int`
+            The target Channel ID.
+        record: :class:`SubmissionRecord`
+            The submission to deliver.
+        """
+        state = self.channels.get(channel_id)
+        if not state.deliverable or not self.quotas.can_deliver(state.channel.guild.id):
+            self.handled(channel_id, (record,))
+            return
+
+        message = self.render_submission(record, state)
+        if message is None:
+            self.handled(channel_id, (record,))
+            return
+
+        await self.gate.submit(state.channel, record, message)
+
+    def schedule(
+        self,
+        channel: disnake.TextChannel,
+        message: Dict[str, Any],
+        records: Sequence[SubmissionRecord] = ()
+    ) -> asyncio.Future:
+        """
+        Schedules sending of rendered submission message to the channel and returns future of the sent message.
+
+        Sending is scheduled fairly across guilds. Submissions of the message are handled
+        once it's sent or failed to send, cancelled sends leave them not handled.
+
+        Parameters
+        ----------
+        channel: :class:`disnake.TextChannel`
+            The target channel.
+        message: Dict[:class:`str`, Any]
+            The keyword arguments of :meth:`disnake.abc.Messageable.send`.
+        records: Sequence[:class:`SubmissionRecord`]
+            The submissions of the message, counted in activity statistics.
+        """
+        delivery = self.scheduler.submit(channel.guild.id, lambda: channel.send(**message))
+        self.deliveries.add(delivery)
+        delivery.add_done_callback(functools.partial(self._on_delivery_done, channel, records))
+        return delivery
+
+    async def deliver(
+        self,
+        channel: disnake.TextChannel,
+        message: Dict[str, Any],
+        records: Sequence[SubmissionRecord] = ()
+    ) -> bool:
+        """
+        Sends rendered submission message to the channel.
+
+        Sending is shielded from cancellation of the feeder, so stopped feeds
+        don't drop messages in the middle of sending. Returns whether the message was sent.
+
+        Parameters
+        ----------
+        channel: :class:`disnake.TextChannel`
+            The target channel.
+        message: Dict[:class:`str`, Any]
+            The keyword arguments of :meth:`disnake.abc.Messageable.send`.
+        records: Sequence[:class:`SubmissionRecord`]
+            The submissions of the message, counted in activity statistics.
+        """
+        delivery = self.schedule(channel, message, records)
+        try:
+            await asyncio.shield(delivery)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            return False
+        return True
+
+    def _on_delivery_done(
+        self,
+        channel: disnake.TextChannel,
+        records: Sequence[SubmissionRecord],
+        delivery: asyncio.Future
+    ) -> None:
+        self.deliveries.discard(delivery)
+        # Cancelled on shutdown, submissions are fed again after restart
+        if delivery.cancelled():
+            return
+
+        self.handled(channel.id, records)
+        if delivery.exception() is not None:
+            log.error(f'Message was not sent: {delivery.exception()}')
+            self.bot.activity.send_error(channel.id, records[0].subreddit if records else None)
+            return
+
+        self.quotas.delivered(channel.guild.id)
+        for record in records:
+            self.bot.activity.delivered(channel.id, record.subreddit, record.created_utc)
+            self.bot.archive.add(record, channel.id, channel.guild.id)
+
+        if not self.bot.startup.is_done('delivery'):
+            self.bot.startup.done('delivery')
+            log.info(self.bot.startup.report())
+
+    async def poll_submissions(self, subreddit_name: str, skip_existing: bool = True) -> AsyncIterator[Optional[SubmissionRecord]]:
+        """
+        Yields records of new submissions of subreddit, and ``None`` after every poll.
+
+        Uses backend configured by ``feeds.backend``: ``stream`` is asyncpraw submission
+        stream, ``listing`` is :class:`ListingPoller` which skips asyncpraw object model.
+
+        Parameters
+        ----------
+        subreddit_name: :class:`str`
+            The Subreddit display name.
+        skip_existing: :class:`bool`
+            Whether to skip submissions existing before the first poll.
+        """
+        if self.config['feeds']['backend'] == 'listing':
+            poller = ListingPoller(self.reddit, subreddit_name, lambda: self.text_limit, skip_existing=skip_existing)
+            while True:
+                for record in await poller.poll():
+                    yield record
+                yield None
+
+        subreddit = await self.reddit.subreddit(subreddit_name)
+        async for sm in subreddit.stream.submissions(skip_existing=skip_existing, pause_after=-1):
+            if sm is None:
+                yield None
+                continue
+            # Keeping only compact record, the model with raw data is not needed anymore
+            record = SubmissionRecord.from_submission(sm, self.text_limit)
+            del sm
+            yield record
+
+    async def subreddit_feeder(self, subreddit: models.Subreddit, channel: disnake.TextChannel, checkpoint: float = 0.0):
+        subreddit_name = subreddit.display_name
+        del subreddit
+        # Channel is resolved from state cache for every submission, so it's never stale
+        channel_id, guild_id = channel.id, channel.guild.id
+        del channel
+        skip_existing = not checkpoint
+        newest = checkpoint
+        progress = self.progress[(channel_id, subreddit_name)] = FeedProgress(checkpoint)
 
-    async def subreddit_feeder(self, subreddit: models.Subreddit, channel: disnake.TextChannel):
         while True:
+            generation = self.reddit_generation
+            backend = self.config['feeds']['backend']
+            delay = 1.0
+            found = False
+            first_poll = True
             try:
-                async for sm in subreddit.stream.submissions(skip_existing=True):
-                    view = disnake.ui.View()
-
-                    if hasattr(sm, 'poll_data'):
-                        content = f'*Poll on `r/{sm.subreddit.display_name}` by `u/{sm.author.name}`*'
-                        view.add_item(disnake.ui.Button(label='View Poll', url=f'https://reddit.com{sm.permalink}'))
-                    else:
-                        content = f'*Submission on `r/{sm.subreddit.display_name}` by `u/{sm.author.name}`*'
-                        view.add_item(disnake.ui.Button(label='View Submission', url=f'https://reddit.com{sm.permalink}'))
-
-                    if sm.link_flair_text:
-                        content += f' **[{escape_markdown(sm.link_flair_text)}]**'
-
-                    if sm.spoiler:
-                        content += ' **[Spoiler]**'
-
-                    if sm.over_18:
-                        if channel.is_nsfw():
-                            content += ' **[NSFW]**'
-                        else:
-                            # Ignoring submission which channel is not NSFW marked
-                            continue
-
-                    content += f'\n**{escape_markdown(sm.title)}**'
-                    selftext = sm.selftext
-
-                    if hasattr(sm, 'poll_data'):
-                        selftext = re.sub(r'\n\n\[View Poll\]\(https://www\.reddit\.com/poll\/\w+\)', '', selftext)
-
-                    if selftext != '':
-                        # Remove HTML-like zero-witdh space
-                        selftext = selftext.replace('&#x200B;', '')
-                        # Replace Reddit spoiler format into Discord format
-                        selftext = selftext.replace('>!', '||').replace('!<', '||')
-                        # Escape "less/greater than" characters to exclude Discord mention chance
-                        selftext = selftext.replace('<', '\\<').replace('>', '\\>')
-
-                        # Text limit
-                        if len(selftext) >= self.text_limit:
-                            selftext = f'{selftext[:self.text_limit]} *[...]*'
-
-                        if sm.spoiler:
-                            selftext = selftext.replace('||', '')
-                            content += f'\n\n||{selftext}||'
-                        else:
-                            content += f'\n\n{selftext}'
-
-                    if sm.url.endswith(('.jpg', '.png', '.gif')):
-                        embed = disnake.Embed(colour=0xff5700, type='image')
-                        embed.set_image(url=sm.url)
-                        try:
-                            await channel.send(content=content, view=view, embeds=[embed])
-                        except Exception as e:
-                            log.error(f'Message was not sent: {e}')
+                async for record in self.poll_submissions(subreddit_name, skip_existing):
+                    if record is None:
+                        first_poll = False
+                        self.bot.activity.reddit_call(channel_id, subreddit_name)
+                        # Following Reddit client replacement or backend change by reloaded configuration
+                        if generation != self.reddit_generation or backend != self.config['feeds']['backend']:
+                            break
+
+                        # Exponential backoff with jitter for quiet subreddits, as stream does by default
+                        if found:
+                            delay = 1.0
+                            found = False
+                        max_jitter = delay / 16.0
+                        await asyncio.sleep(delay + random.random() * max_jitter - max_jitter / 2)
+                        delay = min(delay * 2, self.config['feeds']['poll-max-delay'])
                         continue
 
-                    if hasattr(sm, 'secure_media') and sm.secure_media:
-                        if 'reddit_video' in sm.secure_media:
-                            content += '\n*[Video Attachment]*'
-                        elif 'oembed' in sm.secure_media:
-                            content += '\n*[Embed Attachment]*'
-                        await channel.send(content=content, view=view)
-                    elif hasattr(sm, 'gallery_data'):
-                        embeds = []
-                        for data in sm.gallery_data['items']:
-                            # If had reached embeds limit
-                            if len(embeds) >= 3:
-                                break
-
-                            # If media is not valid, skipping it
-                            if sm.media_metadata[data['media_id']]['status'] != 'valid':
-                                continue
-
-                            # If media is image...
-                            if sm.media_metadata[data['media_id']]['e'] == 'Image':
-                                embed = disnake.Embed(colour=0xff5700, type='image')
-                                embed.set_image(url=sm.media_metadata[data['media_id']]['s']['u'])
-                                if 'caption' in data:
-                                    embed.set_footer(text=data['caption'])
-                                embeds.append(embed)
-
-                            # If media is gif/video...
-                            elif sm.media_metadata[data['media_id']]['e'] == 'AnimatedImage':
-                                embed = disnake.Embed(colour=0xff5700, type='image')
-                                embed.set_image(url=sm.media_metadata[data['media_id']]['s']['gif'])
-                                if 'caption' in data:
-                                    embed.set_footer(text=data['caption'])
-                                embeds.append(embed)
-
-                        await channel.send(content=content, embeds=embeds, view=view)
-                    else:
-                        await channel.send(content=content, view=view)
+                    found = True
+
+                    # Restarted polling yields recent submissions which were already fed
+                    if first_poll and record.created_utc <= newest:
+                        continue
+
+                    self.bot.activity.seen(channel_id, subreddit_name)
+                    newest = max(newest, record.created_utc)
+                    progress.track(record)
+                    try:
+                        await self.dispatch(channel_id, record)
+                    except Exception:
+                        self.handled(channel_id, (record,))
+                        log.exception(f'Failed to deliver submission {record.id} (RedditFeed:{channel_id}:{subreddit_name})')
             except Exception as e:
-                log.exception(f'Raised exception in task loop (RedditFeed:{channel.guild.id}:{channel.id}:{subreddit.display_name})')
-                continue
+                log.exception(f'Raised exception in task loop (RedditFeed:{guild_id}:{channel_id}:{subreddit_name})')
+                await asyncio.sleep(self.config['feeds']['retry-delay'])
+
+            # Submissions are not skipped on restart, they are filtered by creation time instead
+            if newest:
+                skip_existing = False
+
+    async def queued_feeder(self, subreddit_name: str, channel: disnake.TextChannel, checkpoint: float = 0.0):
+        channel_id = channel.id
+        del channel
+        # Records which were not acknowledged before restart are read again
+        replaying = bool(checkpoint)
+        progress = self.progress[(channel_id, subreddit_name)] = FeedProgress(checkpoint)
+
+        subscription = self.ingest.subscribe(subreddit_name, channel_id)
+        try:
+            while True:
+                row_id, record = await subscription.queue.get()
+                if replaying and record.created_utc <= checkpoint:
+                    subscription.done(row_id)
+                    continue
+                replaying = False
+
+                # Record is acknowledged in queue once it's handled, not when it's submitted for delivery
+                self.bot.activity.seen(channel_id, subreddit_name)
+                progress.track(record, functools.partial(subscription.done, row_id))
+                try:
+                    await self.dispatch(channel_id, record)
+                except Exception:
+                    self.handled(channel_id, (record,))
+                    log.exception(f'Failed to deliver submission {record.id} (RedditFeed:{channel_id}:{subreddit_name})')
+        finally:
+            # Records of feeds stopped without unsubscribing are kept for their restart
+            self.ingest.unsubscribe(subreddit_name, subscription, keep=(channel_id, subreddit_name) in self.progress)
+
+    async def ranked_feeder(self, subreddit_name: str, channel: disnake.TextChannel, kind: str, max_rank: int, min_score: int):
+        # Feeds of the same subreddit listing share one watcher, so the listing is polled once
+        key = (subreddit_name.lower(), kind)
+        watcher = self.watchers.get(key)
+        if watcher is None:
+            watcher = self.watchers[key] = ListingWatcher(self, subreddit_name, kind)
+
+        channel_id = channel.id
+        del channel
+
+        subscription = watcher.subscribe(max_rank, min_score)
+        try:
+            while True:
+                record = await subscription.get()
+                self.bot.activity.seen(channel_id, subreddit_name)
+                try:
+                    await self.dispatch(channel_id, record)
+                except Exception:
+                    log.exception(f'Failed to deliver submission {record.id} (RedditFeed:{channel_id}:{subreddit_name}/{kind})')
+        finally:
+            if watcher.unsubscribe(subscription):
+                del self.watchers[key]
@@ -0,0 +1,155 @@
+import logging
+import asyncio
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from bot.utils.records import SubmissionRecord
+
+log = logging.getLogger(__name__)
+
+# Feed kinds, "new" is fed by submissions polling and others by ranked listing snapshots
+KINDS = ('new', 'hot', 'rising', 'top')
+RANKED_KINDS = ('hot', 'rising', 'top')
+
+# Count of remembered emitted fullnames per subscription
+EMITTED_LIMIT = 1000
+
+
+class ListingSubscription:
+    """Subscription to ranked listing with rank and score thresholds."""
+
+    def __init__(self, max_rank: int, min_score: int):
+        self.max_rank = max_rank
+        self.min_score = min_score
+        self.queue: asyncio.Queue[SubmissionRecord] = asyncio.Queue()
+        # Subscription made before the first poll takes the first snapshot as baseline
+        self.baseline = True
+        self._emitted: OrderedDict[str, None] = OrderedDict()
+
+    def qualifies(self, rank: int, score: int) -> bool:
+        return rank <= self.max_rank and score >= self.min_score
+
+    def seed(self, snapshot: Dict[str, Tuple[int, int]]) -> None:
+        """Marks entries currently crossing thresholds as already emitted."""
+        for fullname, (rank, score) in snapshot.items():
+            if self.qualifies(rank, score):
+                self.mark(fullname)
+        self.baseline = False
+
+    def mark(self, fullname: str) -> bool:
+        """Marks entry as emitted, returns whether it was not emitted before."""
+        if fullname in self._emitted:
+            self._emitted.move_to_end(fullname)
+            return False
+        self._emitted[fullname] = None
+        if len(self._emitted) > EMITTED_LIMIT:
+            self._emitted.popitem(last=False)
+        return True
+
+    async def get(self) -> SubmissionRecord:
+        return await self.queue.get()
+
+
+class ListingWatcher:
+    """Shared poll of ranked listing (hot/rising/top) of subreddit for all its subscribers.
+
+    Keeps compact snapshot of the previous poll (fullname -> rank and score), and on
+    every poll compares only entries which changed since the snapshot, emitting to
+    subscribers the entries which newly cross their rank and score thresholds.
+    Records are built only for emitted entries.
+    """
+
+    def __init__(self, feeder, subreddit: str, kind: str):
+        self.feeder = feeder
+        self.subreddit = subreddit
+        self.kind = kind
+        self.snapshot: Optional[Dict[str, Tuple[int, int]]] = None
+        self.subscriptions: Set[ListingSubscription] = set()
+        self.task: Optional[asyncio.Task] = None
+
+    def subscribe(self, max_rank: int, min_score: int) -> ListingSubscription:
+        """
+        Adds subscription and starts polling if it's not started.
+
+        Parameters
+        ----------
+        max_rank: :class:`int`
+            The maximum rank (position in listing) of emitted entries.
+        min_score: :class:`int`
+            The minimum score of emitted entries.
+        """
+        subscription = ListingSubscription(max_rank, min_score)
+        if self.snapshot is not None:
+            subscription.seed(self.snapshot)
+        self.subscriptions.add(subscription)
+
+        if self.task is None:
+            self.task = asyncio.create_task(self._run(), name=f'ListingWatcher_{self.subreddit}_{self.kind}')
+        return subscription
+
+    def unsubscribe(self, subscription: ListingSubscription) -> bool:
+        """
+        Removes subscription and stops polling if there are no subscriptions left.
+
+        Returns whether the watcher was stopped.
+        """
+        self.subscriptions.discard(subscription)
+        if self.subscriptions:
+            return False
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+        return True
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.poll()
+            except Exception:
+                log.exception(f'Raised exception in listing watcher (r/{self.subreddit}/{self.kind})')
+                await asyncio.sleep(self.feeder.config['feeds']['retry-delay'])
+                continue
+            await asyncio.sleep(self.feeder.config['feeds']['ranked-poll-interval'])
+
+    async def fetch(self) -> List[Dict[str, Any]]:
+        """Requests listing and returns its submissions data in rank order."""
+        params = {'limit': 100}
+        if self.kind == 'top':
+            params['t'] = 'day'
+        self.feeder.bot.activity.reddit_call()
+        data = await self.feeder.reddit.request(method='GET', path=f'r/{self.subreddit}/{self.kind}', params=params)
+        return [
+            child['data'] for child in data['data']['children']
+            # Stickied submissions are pinned at the top regardless of rank
+            if child['kind'] == 't3' and not child['data'].get('stickied')
+        ]
+
+    async def poll(self) -> None:
+        """Polls listing once and emits entries newly crossing subscriptions thresholds."""
+        entries = await self.fetch()
+
+        snapshot = {}
+        changed = []
+        previous = self.snapshot or {}
+        for rank, data in enumerate(entries, start=1):
+            fullname = data['name']
+            entry = (rank, data['score'])
+            snapshot[fullname] = entry
+            # Entries with the same rank and score can't newly cross any threshold
+            if previous.get(fullname) != entry:
+                changed.append((fullname, entry, data))
+        self.snapshot = snapshot
+
+        for subscription in list(self.subscriptions):
+            if subscription.baseline:
+                subscription.seed(snapshot)
+                continue
+
+            for fullname, (rank, score), data in changed:
+                if not subscription.qualifies(rank, score):
+                    continue
+                old = previous.get(fullname)
+                if old is not None and subscription.qualifies(*old):
+                    continue
+                if subscription.mark(fullname):
+                    subscription.queue.put_nowait(SubmissionRecord.from_data(data, self.feeder.text_limit))
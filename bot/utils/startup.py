@@ -0,0 +1,140 @@
+import logging
+import time
+import asyncio
+from contextlib import contextmanager
+from os import getpid
+from typing import Dict, Iterator, Optional
+import psutil
+
+log = logging.getLogger(__name__)
+
+# Startup phases in order of readiness
+PHASES = (
+    'config',
+    'database',
+    'reddit',
+    'gateway',
+    'commands',
+    'feeds',
+    'delivery'
+)
+
+
+class StartupPipeline:
+    """Startup phases with readiness events and timing report.
+
+    Every phase has an event which is set once the phase is done, so dependent
+    phases wait for readiness instead of polling. Times are measured from process start.
+    """
+
+    def __init__(self):
+        self.process_start = psutil.Process(getpid()).create_time()
+        self._events: Dict[str, asyncio.Event] = {name: asyncio.Event() for name in PHASES}
+        self._began: Dict[str, float] = {}
+        self._finished: Dict[str, float] = {}
+        self.failed: Dict[str, str] = {}
+
+    def begin(self, name: str) -> None:
+        """
+        Marks phase as began, only the first call is recorded.
+
+        Parameters
+        ----------
+        name: :class:`str`
+            The phase name.
+        """
+        self._began.setdefault(name, time.time())
+
+    def done(self, name: str) -> None:
+        """
+        Marks phase as done and sets its readiness event, only the first call is recorded.
+
+        Parameters
+        ----------
+        name: :class:`str`
+            The phase name.
+        """
+        if name in self._finished:
+            return
+        self.begin(name)
+        self._finished[name] = time.time()
+        self._events[name].set()
+        log.info(f'Startup phase "{name}" is done in {self.duration(name):.3f}s ({self.elapsed(name):.3f}s since process start)')
+
+    def fail(self, name: str, reason: str) -> None:
+        """
+        Marks phase as failed, its readiness event is never set.
+
+        Parameters
+        ----------
+        name: :class:`str`
+            The phase name.
+        reason: :class:`str`
+            The failure reason.
+        """
+        self.failed[name] = reason
+        log.error(f'Startup phase "{name}" failed: {reason}')
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """
+        Context manager which begins phase and marks it done or failed on exit.
+
+        Parameters
+        ----------
+        name: :class:`str`
+            The phase name.
+        """
+        self.begin(name)
+        try:
+            yield
+        except Exception as e:
+            self.fail(name, str(e))
+            raise
+        self.done(name)
+
+    def is_done(self, name: str) -> bool:
+        return name in self._finished
+
+    async def wait(self, *names: str) -> None:
+        """
+        Waits until all given phases are done.
+
+        Parameters
+        ----------
+        *names: :class:`str`
+            The phase names.
+        """
+        for name in names:
+            await self._events[name].wait()
+
+    def duration(self, name: str) -> Optional[float]:
+        """Returns duration of done phase in seconds."""
+        if name not in self._finished:
+            return None
+        return self._finished[name] - self._began[name]
+
+    def elapsed(self, name: str) -> Optional[float]:
+        """Returns seconds from process start until phase was done."""
+        if name not in self._finished:
+            return None
+        return self._finished[name] - self.process_start
+
+    def report(self) -> str:
+        """Returns startup timing report."""
+        lines = ['Startup report:']
+        for name in PHASES:
+            if name in self._finished:
+                began = self._began[name] - self.process_start
+                lines.append(
+                    f'  {name:<10} began at {began:7.3f}s, done at {self.elapsed(name):7.3f}s '
+                    f'(took {self.duration(name):.3f}s)'
+                )
+            elif name in self.failed:
+                lines.append(f'  {name:<10} failed: {self.failed[name]}')
+            elif name in self._began:
+                began = self._began[name] - self.process_start
+                lines.append(f'  {name:<10} began at {began:7.3f}s, in progress')
+            else:
+                lines.append(f'  {name:<10} pending')
+        return '\n'.join(lines)
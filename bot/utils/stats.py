@@ -0,0 +1,145 @@
+import time
+from os import getpid
+from typing import Dict, Iterable, NamedTuple
+import psutil
+import disnake
+
+
+class StatisticsSnapshot(NamedTuple):
+    """Snapshot of bot statistics."""
+
+    guilds: int
+    users: int
+    feeds: int
+    feed_guilds: int
+    pid: int
+    process_rss: int
+    cpu_percent: float
+    ram_total: int
+    ram_used: int
+    ram_available: int
+    ram_percent: float
+    sampled_at: float
+
+
+class BotStatistics:
+    """Bot statistics maintained incrementally from gateway events and feed changes.
+
+    Process and system metrics are sampled by :meth:`sample` on a timer, so reading
+    statistics never scans guilds or feeds and never blocks on psutil.
+    """
+
+    def __init__(self):
+        self.process = psutil.Process(getpid())
+        self._guild_members: Dict[int, int] = {}
+        self._guild_feeds: Dict[int, int] = {}
+        self.users = 0
+        self.feeds = 0
+
+        self.cpu_percent = 0.0
+        self.process_rss = 0
+        self.ram = None
+        self.sampled_at = 0.0
+        self.sample()
+
+    @property
+    def guilds(self) -> int:
+        return len(self._guild_members)
+
+    @property
+    def feed_guilds(self) -> int:
+        return len(self._guild_feeds)
+
+    def reset_guilds(self, guilds: Iterable[disnake.Guild]) -> None:
+        """
+        Recounts guilds and users, used once on ready.
+
+        Member counts are taken as guilds are received, member join and leave events
+        need privileged members intent which the bot doesn't request.
+
+        Parameters
+        ----------
+        guilds: Iterable[:class:`disnake.Guild`]
+            The guilds the bot is in.
+        """
+        self._guild_members = {guild.id: guild.member_count or 0 for guild in guilds}
+        self.users = sum(self._guild_members.values())
+
+    def guild_joined(self, guild: disnake.Guild) -> None:
+        """
+        Counts joined guild and its members.
+
+        Parameters
+        ----------
+        guild: :class:`disnake.Guild`
+            The joined guild.
+        """
+        self.guild_removed(guild.id)
+        self._guild_members[guild.id] = guild.member_count or 0
+        self.users += self._guild_members[guild.id]
+
+    def guild_removed(self, guild_id: int) -> None:
+        """
+        Uncounts removed guild and its members.
+
+        Parameters
+        ----------
+        guild_id: :class:`int`
+            The removed Guild ID.
+        """
+        self.users -= self._guild_members.pop(guild_id, 0)
+
+    def feed_started(self, guild_id: int) -> None:
+        """
+        Counts started feed.
+
+        Parameters
+        ----------
+        guild_id: :class:`int`
+            The Guild ID of the feed.
+        """
+        self._guild_feeds[guild_id] = self._guild_feeds.get(guild_id, 0) + 1
+        self.feeds += 1
+
+    def feed_stopped(self, guild_id: int) -> None:
+        """
+        Uncounts stopped feed.
+
+        Parameters
+        ----------
+        guild_id: :class:`int`
+            The Guild ID of the feed.
+        """
+        count = self._guild_feeds.get(guild_id, 0)
+        if count == 0:
+            return
+        if count == 1:
+            del self._guild_feeds[guild_id]
+        else:
+            self._guild_feeds[guild_id] = count - 1
+        self.feeds -= 1
+
+    def sample(self) -> None:
+        """Samples process and system metrics."""
+        # CPU usage is measured since the previous sample
+        self.cpu_percent = psutil.cpu_percent()
+        self.process_rss = self.process.memory_info().rss
+        self.ram = psutil.virtual_memory()
+        self.sampled_at = time.time()
+
+    def snapshot(self) -> StatisticsSnapshot:
+        """Returns snapshot of current statistics."""
+        return StatisticsSnapshot(
+            guilds=self.guilds,
+            users=self.users,
+            feeds=self.feeds,
+            feed_guilds=self.feed_guilds,
+            pid=self.process.pid,
+            process_rss=self.process_rss,
+            cpu_percent=self.cpu_percent,
+            ram_total=self.ram.total,
+            ram_used=self.ram.used,
+            ram_available=self.ram.available,
+            ram_percent=self.ram.percent,
+            sampled_at=self.sampled_at
+        )
@@ -0,0 +1,132 @@
+import bisect
+import time
+from collections import OrderedDict
+from typing import Dict, List
+
+
+class SubredditIndex:
+    """Local prefix index of known Subreddit names used for autocompletion.
+
+    Names of feeding subreddits are pinned and never expire, names found by
+    Reddit searches are cached with TTL and evicted by least recent use.
+    """
+
+    def __init__(self, max_size: int = 5000, ttl: float = 3600.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        # Sorted lowercase names for prefix lookups by bisection
+        self._keys: List[str] = []
+        # Lowercase name -> display name
+        self._names: Dict[str, str] = {}
+        # Lowercase name -> expiry time of cached (not pinned) names, in LRU order
+        self._expires: OrderedDict[str, float] = OrderedDict()
+        # Lowercase name -> count of feeds referencing the name
+        self._pins: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def _insert(self, name: str) -> str:
+        key = name.lower()
+        if key not in self._names:
+            bisect.insort(self._keys, key)
+        self._names[key] = name
+        return key
+
+    def _remove(self, key: str) -> None:
+        index = bisect.bisect_left(self._keys, key)
+        if index < len(self._keys) and self._keys[index] == key:
+            del self._keys[index]
+        self._names.pop(key, None)
+        self._expires.pop(key, None)
+
+    def pin(self, name: str) -> None:
+        """
+        Adds Subreddit name which is used by feed to index without expiration.
+
+        Parameters
+        ----------
+        name: :class:`str`
+            The Subreddit display name.
+        """
+        key = self._insert(name)
+        self._expires.pop(key, None)
+        self._pins[key] = self._pins.get(key, 0) + 1
+
+    def unpin(self, name: str) -> None:
+        """
+        Releases Subreddit name pinned by :meth:`pin`.
+
+        The name stays in index as cached entry until it expires or evicted.
+
+        Parameters
+        ----------
+        name: :class:`str`
+            The Subreddit display name.
+        """
+        key = name.lower()
+        count = self._pins.get(key, 0) - 1
+        if count > 0:
+            self._pins[key] = count
+            return
+        self._pins.pop(key, None)
+        if key in self._names:
+            self._expires[key] = time.monotonic() + self.ttl
+            self._evict()
+
+    def add(self, name: str) -> None:
+        """
+        Adds or refreshes cached Subreddit name in index.
+
+        Parameters
+        ----------
+        name: :class:`str`
+            The Subreddit display name.
+        """
+        key = self._insert(name)
+        if key in self._pins:
+            return
+        self._expires[key] = time.monotonic() + self.ttl
+        self._expires.move_to_end(key)
+        self._evict()
+
+    def _evict(self) -> None:
+        while len(self._expires) > self.max_size:
+            key, _ = self._expires.popitem(last=False)
+            self._remove(key)
+
+    def search(self, prefix: str, limit: int = 25) -> List[str]:
+        """
+        Returns Subreddit display names starting with given prefix.
+
+        Parameters
+        ----------
+        prefix: :class:`str`
+            The case-insensitive name prefix.
+        limit: :class:`int`
+            The maximum count of returned names.
+        """
+        prefix = prefix.lower()
+        now = time.monotonic()
+        result = []
+        expired = []
+
+        index = bisect.bisect_left(self._keys, prefix)
+        while index < len(self._keys) and len(result) < limit:
+            key = self._keys[index]
+            if not key.startswith(prefix):
+                break
+            index += 1
+
+            expires = self._expires.get(key)
+            if expires is not None:
+                if expires <= now:
+                    expired.append(key)
+                    continue
+                self._expires.move_to_end(key)
+            result.append(self._names[key])
+
+        for key in expired:
+            self._remove(key)
+
+        return result
@@ -2,6 +2,7 @@ import logging
 from disnake.ext import commands
 
 from bot import DisredditBot
+from bot.utils import exceptions
 
 
 class CogAdmin(commands.Cog):
@@ -25,6 +26,43 @@ class CogAdmin(commands.Cog):
         self.bot.reload_extension('cogs.feed')
         await ctx.reply(':arrows_counterclockwise: Reloaded')
 
+    @commands.command(name='reloadconfig', description='Reloads a bot configuration', hidden=True)
+    @commands.is_owner()
+    async def cmd_reload_config(self, ctx: commands.Context):
+        try:
+            changed = self.bot.config.reload()
+        except exceptions.InvalidConfig as e:
+            await ctx.reply(f':x: Configuration is not reloaded: {e}')
+            return
+
+        if changed:
+            await ctx.reply(f':arrows_counterclockwise: Reloaded configuration, changed: `{", ".join(sorted(changed))}`')
+        else:
+            await ctx.reply(':arrows_counterclockwise: Reloaded configuration without changes')
+
+    @commands.command(name='usage', description='Shows the heaviest servers by feeds and deliveries', hidden=True)
+    @commands.is_owner()
+    async def cmd_usage(self, ctx: commands.Context, count: int = 10):
+        feeder = self.bot.feeder
+        report = feeder.quotas.report(
+            {guild_id: len(tasks) for guild_id, tasks in feeder.feeders.items() if tasks},
+            feeder.scheduler.pending
+        )
+        if not report:
+            await ctx.reply(':x: There are no feeds or deliveries yet')
+            return
+
+        lines = []
+        for item in report[:count]:
+            guild = self.bot.get_guild(item['guild_id'])
+            messages_limit = item['messages_limit'] or 'unlimited'
+            lines.append(
+                f'`{item["guild_id"]}` {guild.name if guild else "(unknown)"} [{item["tier"]}]: '
+                f'{item["feeds"]}/{item["feeds_limit"]} feeds, {item["messages"]}/{messages_limit} messages this hour, '
+                f'{item["delivered"]} delivered, {item["throttled"]} throttled, {item["pending"]} pending'
+            )
+        await ctx.reply('\n'.join(lines)[:2000])
+
 
 def setup(bot: DisredditBot) -> None:
     bot.add_cog(CogAdmin(bot))
@@ -19,14 +19,72 @@ class CogEvents(commands.Cog):
     @commands.Cog.listener()
     async def on_ready(self):
         self.log.info('Bot is ready as {0} (ID: {0.id})'.format(self.bot.user))
+        self.bot.startup.done('gateway')
+        self.bot.stats.reset_guilds(self.bot.guilds)
+        # Gateway cache is rebuilt on reconnect, so channel states are resolved again
+        self.bot.feeder.channels.clear()
 
     @commands.Cog.listener()
     async def on_guild_join(self, guild: disnake.Guild):
         self.log.info('Bot has been invited to guild: {0.name} (ID: {0.id})'.format(guild))
+        self.bot.stats.guild_joined(guild)
 
     @commands.Cog.listener()
     async def on_guild_remove(self, guild: disnake.Guild):
         self.log.info('Bot has been kicked from guild: {0.name} (ID: {0.id})'.format(guild))
+        self.bot.stats.guild_removed(guild.id)
+        self.bot.feeder.channels.invalidate_guild(guild.id)
+
+    @commands.Cog.listener()
+    async def on_guild_update(self, before: disnake.Guild, after: disnake.Guild):
+        self.bot.feeder.channels.invalidate_guild(after.id)
+
+    @commands.Cog.listener()
+    async def on_guild_available(self, guild: disnake.Guild):
+        self.bot.feeder.channels.invalidate_guild(guild.id)
+
+    @commands.Cog.listener()
+    async def on_guild_unavailable(self, guild: disnake.Guild):
+        self.bot.feeder.channels.invalidate_guild(guild.id)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_create(self, channel: disnake.abc.GuildChannel):
+        self.bot.feeder.channels.invalidate(channel.id)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_update(self, before: disnake.abc.GuildChannel, after: disnake.abc.GuildChannel):
+        # Permission overwrites and NSFW flag are channel properties
+        self.bot.feeder.channels.invalidate(after.id)
+        if isinstance(after, disnake.CategoryChannel):
+            # Synced channels inherit overwrites of their category
+            for channel in after.channels:
+                self.bot.feeder.channels.invalidate(channel.id)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_delete(self, channel: disnake.abc.GuildChannel):
+        self.bot.feeder.channels.invalidate(channel.id)
+
+    @commands.Cog.listener()
+    async def on_thread_update(self, before: disnake.Thread, after: disnake.Thread):
+        self.bot.feeder.channels.invalidate(after.id)
+
+    @commands.Cog.listener()
+    async def on_raw_thread_delete(self, payload: disnake.RawThreadDeleteEvent):
+        self.bot.feeder.channels.invalidate(payload.thread_id)
+
+    @commands.Cog.listener()
+    async def on_guild_role_update(self, before: disnake.Role, after: disnake.Role):
+        self.bot.feeder.channels.invalidate_guild(after.guild.id)
+
+    @commands.Cog.listener()
+    async def on_guild_role_delete(self, role: disnake.Role):
+        self.bot.feeder.channels.invalidate_guild(role.guild.id)
+
+    @commands.Cog.listener()
+    async def on_member_update(self, before: disnake.Member, after: disnake.Member):
+        # Bot's own roles define its permissions in all channels of the guild
+        if after.id == self.bot.user.id:
+            self.bot.feeder.channels.invalidate_guild(after.guild.id)
 
 
 def setup(bot: DisredditBot) -> None:
@@ -7,6 +7,7 @@ from disnake.ext import commands
 
 from bot import DisredditBot
 from bot.utils import exceptions
+from bot.utils.snapshot import KINDS
 
 
 class CogFeed(commands.Cog):
@@ -24,26 +25,58 @@ class CogFeed(commands.Cog):
         self.feeder.feed_stop_all()
 
     async def _start_feeders(self) -> None:
-        if len(self.feeder.feeders) > 0:
+        if any(self.feeder.feeders.values()):
             return
 
-        await self.bot.wait_until_ready()
+        await self.bot.startup.wait('database', 'reddit', 'gateway')
+        self.bot.startup.begin('feeds')
 
-        while True:
-            if not self.bot.database.is_connected:
-                await asyncio.sleep(0.2)
-            else:
-                break
+        feeds = await self.bot.database.fetch_all(
+            'SELECT channel_id, subreddit, kind, max_rank, min_score FROM feeds'
+        )
+        checkpoints = await self.feeder.checkpoints.load()
+
+        # Starting feeds concurrently, each start makes a few Reddit requests
+        semaphore = asyncio.Semaphore(self.bot.config['feeds']['restore-concurrency'])
+        await asyncio.gather(*(
+            self._start_feeder(
+                semaphore,
+                feed['channel_id'],
+                feed['subreddit'],
+                checkpoints.get((feed['channel_id'], feed['subreddit']), 0.0),
+                feed['kind'],
+                feed['max_rank'],
+                feed['min_score']
+            )
+            for feed in feeds
+        ))
 
-        feeds = await self.bot.database.fetch_all('SELECT channel_id, subreddit FROM feeds')
-        for feed in feeds:
-            self.log.info(f'Trying to start feed "{feed[1]}" for channel {feed[0]}...')
+        if not self.bot.startup.is_done('feeds'):
+            self.bot.startup.done('feeds')
+            self.bot.startup.begin('delivery')
+            self.log.info(self.bot.startup.report())
+
+    async def _start_feeder(
+        self,
+        semaphore: asyncio.Semaphore,
+        channel_id: int,
+        subreddit: str,
+        checkpoint: float,
+        kind: str,
+        max_rank: int,
+        min_score: int
+    ) -> None:
+        async with semaphore:
+            self.log.info(f'Trying to start feed "{subreddit}" for channel {channel_id}...')
             try:
-                await self.feeder.feed_start(feed[1], feed[0])
+                await self.feeder.feed_start(subreddit, channel_id, checkpoint or 0.0, kind, max_rank, min_score, check_quota=False)
             except Exception as e:
-                self.log.error(f'Failed to start feed "{feed[1]}" for channel {feed[0]}: {e}')
+                self.log.error(f'Failed to start feed "{subreddit}" for channel {channel_id}: {e}')
+                # Queued submissions of the feed are kept for its start on reload
+                if kind == 'new' and self.feeder.ingest is not None:
+                    self.feeder.ingest.hold(subreddit, channel_id)
             else:
-                self.log.info(f'Started feed "{feed[1]}" for channel {feed[0]}')
+                self.log.info(f'Started feed "{subreddit}" for channel {channel_id}')
 
     @commands.slash_command(
         name='subscribe',
@@ -55,7 +88,8 @@ class CogFeed(commands.Cog):
                 name='subreddit',
                 description='The Subreddit name to subscribe the feed',
                 type=OptionType.string,
-                required=True
+                required=True,
+                autocomplete=True
             ),
             Option(
                 name='channel',
@@ -71,10 +105,40 @@ class CogFeed(commands.Cog):
                     ChannelType.private_thread,
                     ChannelType.news_thread
                 ]
+            ),
+            Option(
+                name='kind',
+                description='The feed kind: every new submission, or submissions reaching hot/rising/top',
+                type=OptionType.string,
+                required=False,
+                choices=list(KINDS)
+            ),
+            Option(
+                name='max_rank',
+                description='The maximum rank in hot/rising/top listing to feed submission',
+                type=OptionType.integer,
+                required=False,
+                min_value=1,
+                max_value=100
+            ),
+            Option(
+                name='min_score',
+                description='The minimum score of hot/rising/top submission to feed',
+                type=OptionType.integer,
+                required=False,
+                min_value=0
             )
         ]
     )
-    async def scmd_subscribe(self, ia: disnake.AppCmdInter, subreddit: str, channel: disnake.TextChannel = None):
+    async def scmd_subscribe(
+        self,
+        ia: disnake.AppCmdInter,
+        subreddit: str,
+        channel: disnake.TextChannel = None,
+        kind: str = 'new',
+        max_rank: int = None,
+        min_score: int = None
+    ):
         if not channel:
             channel = ia.channel
 
@@ -85,17 +149,16 @@ class CogFeed(commands.Cog):
         except KeyError:
             pass
         else:
-            if len(guild_tasks) >= self.bot.config['feeders_limit']:
-                await ia.edit_original_response(f':x: Reached limit of feeds (max: {self.bot.config["feeders_limit"]}) for this server')
-                return
-
             for task in guild_tasks:
                 if task.subreddit.lower() == subreddit.lower() and task.channel == channel.id:
                     await ia.edit_original_response(f':x: Already exists feed of `r/{task.subreddit}` in {channel.mention}')
                     return
 
         try:
-            result = await self.feeder.feed_start(subreddit, channel.id)
+            result = await self.feeder.feed_start(subreddit, channel.id, kind=kind, max_rank=max_rank, min_score=min_score)
+        except exceptions.ChannelNotFound:
+            await ia.edit_original_response(f':x: Channel {channel.mention} is not available for the bot')
+            return
         except exceptions.CannotSendMessages:
             await ia.edit_original_response(f':x: Bot doesn\'t have permission to send message in channel {channel.mention}')
             return
@@ -108,15 +171,26 @@ class CogFeed(commands.Cog):
         except exceptions.SubredditIsNSFW:
             await ia.edit_original_response(f':x: Subreddit `r/{subreddit}` is NSFW, which the channel {channel.mention} is not NSFW marked')
             return
+        except exceptions.FeedQuotaExceeded as e:
+            await ia.edit_original_response(f':x: Reached limit of feeds (max: {e.limit}) for this server')
+            return
         except exceptions.FeedExists:
             await ia.edit_original_response(f':x: Already exists feed of `r/{subreddit}` in this server')
             return
         else:
             await self.bot.database.execute(
-                'INSERT INTO feeds (guild_id, channel_id, subreddit) VALUES (:guild_id, :channel_id, :subreddit)',
-                {'guild_id': channel.guild.id, 'channel_id': channel.id, 'subreddit': result}
+                'INSERT INTO feeds (guild_id, channel_id, subreddit, kind, max_rank, min_score) '
+                'VALUES (:guild_id, :channel_id, :subreddit, :kind, :max_rank, :min_score)',
+                {
+                    'guild_id': channel.guild.id,
+                    'channel_id': channel.id,
+                    'subreddit': result,
+                    'kind': kind,
+                    'max_rank': max_rank,
+                    'min_score': min_score
+                }
             )
-            await ia.edit_original_response(f':white_check_mark: Successful subscribed feed `r/{result}` to {channel.mention}')
+            await ia.edit_original_response(f':white_check_mark: Successful subscribed feed `r/{result}/{kind}` to {channel.mention}')
 
     @commands.slash_command(
         name='unsubscribe',
@@ -160,6 +234,10 @@ class CogFeed(commands.Cog):
                 'DELETE FROM feeds WHERE channel_id = :channel_id AND subreddit = :subreddit',
                 {'channel_id': channel.id, 'subreddit': result}
             )
+            await self.bot.database.execute(
+                'DELETE FROM checkpoints WHERE channel_id = :channel_id AND subreddit = :subreddit',
+                {'channel_id': channel.id, 'subreddit': result}
+            )
             await ia.edit_original_response(f':white_check_mark: Successful unsubscribed feed `r/{result}` from {channel.mention}')
         else:
             await ia.edit_original_response(f':x: There are no feed from `r/{subreddit}` in {channel.mention} or incorrect Subreddit/channel')
@@ -188,17 +266,80 @@ class CogFeed(commands.Cog):
 
             for task in guild_tasks:
                 embed.add_field(
-                    name=f'Feed `r/{task.subreddit}`',
+                    name=f'Feed `r/{task.subreddit}/{task.kind}`',
                     value=f'in <#{task.channel}>',
                     inline=False
                 )
 
             await ia.response.send_message(embed=embed)
 
+    @commands.slash_command(
+        name='search',
+        description='Searches submissions delivered by feeds on this server',
+        dm_permission=False,
+        options=[
+            Option(
+                name='query',
+                description='The words to search in title, flair, author or Subreddit name',
+                type=OptionType.string,
+                required=True
+            ),
+            Option(
+                name='page',
+                description='The page of results',
+                type=OptionType.integer,
+                required=False,
+                min_value=1
+            )
+        ]
+    )
+    async def scmd_search(self, ia: disnake.AppCmdInter, query: str, page: int = 1):
+        if not self.bot.config['archive']['enabled']:
+            await ia.response.send_message(':x: Search of delivered submissions is disabled')
+            return
+
+        await ia.response.defer()
+
+        per_page = 10
+        results, total = await self.bot.archive.search(ia.guild.id, query, page, per_page)
+        if not results:
+            if total:
+                await ia.edit_original_response(f':x: There are only {(total + per_page - 1) // per_page} pages of results')
+            else:
+                await ia.edit_original_response(f':x: Nothing was found by `{disnake.utils.escape_markdown(query[:100])}`')
+            return
+
+        lines = []
+        for result in results:
+            flair = f' **[{disnake.utils.escape_markdown(result["flair"])}]**' if result['flair'] else ''
+            # Angle brackets suppress link embeds
+            lines.append(
+                f'`r/{result["subreddit"]}`{flair} [{disnake.utils.escape_markdown(result["title"][:100])}]'
+                f'(<https://reddit.com{result["permalink"]}>)\n'
+                f'by `u/{result["author"]}` <t:{int(result["created_utc"])}:R> in <#{result["channel_id"]}>'
+            )
+
+        embed = disnake.Embed(
+            title=f':mag: Search results of "{query[:100]}"',
+            colour=disnake.Colour.blurple(),
+            description='\n\n'.join(lines)
+        )
+        embed.set_footer(text=f'Page {page} of {(total + per_page - 1) // per_page} ({total} results)')
+        await ia.edit_original_response(embed=embed)
+
+    @scmd_subscribe.autocomplete('subreddit')
+    async def ac_subscribe_subreddits(self, ia: disnake.AppCmdInter, string: str) -> List[str]:
+        string = string.strip().removeprefix('r/')
+        result = self.feeder.subreddit_index.search(string)
+        if len(result) < 25:
+            # Results of Reddit search will be available on next keystrokes
+            self.feeder.lookup_subreddits(string, ia.author.id)
+        return result
+
     @scmd_unsubscribe.autocomplete('subreddit')
     async def ac_subreddits(self, ia: disnake.AppCmdInter, string: str) -> List[str]:
         result = []
-        for feeder in self.feeder.feeders[ia.guild.id]:
+        for feeder in self.feeder.feeders.get(ia.guild.id, ()):
             if len(result) >= 25:
                 break
             if string.lower() in feeder.subreddit.lower():
@@ -1,18 +1,16 @@
 import logging
-import yaml
 from typing import List, Tuple
 import datetime
 import itertools
 import pygit2
-from os import getpid
-import psutil
 import disnake
-from disnake import ActivityType
+from disnake import ActivityType, Option, OptionType
 from disnake.ext import commands
 from disnake.ext import tasks
 
 from bot import DisredditBot
 from bot.utils import sizeof_fmt, uptime_to_str
+from bot.utils.activity import sparkline
 
 
 class CogGeneral(commands.Cog):
@@ -20,13 +18,6 @@ class CogGeneral(commands.Cog):
         self.bot = bot
         self.log = logging.getLogger(__name__)
 
-        with open('config.yml', 'r') as fp:
-            config = yaml.safe_load(fp)
-
-        self.invite_url = config['bot']['links']['invite']
-        self.support_url = config['bot']['links']['support']
-        self.repos_url = config['bot']['links']['repos']
-
         self.presences: List[Tuple[ActivityType, str]] = [
             (ActivityType.competing, 'hat_kid\'s development'),
             (ActivityType.watching, 'for Reddit feeds'),
@@ -40,13 +31,27 @@ class CogGeneral(commands.Cog):
         ]
         self.presence_iter: int = 0
 
+    @property
+    def invite_url(self) -> str:
+        return self.bot.config['bot']['links']['invite']
+
+    @property
+    def support_url(self) -> str:
+        return self.bot.config['bot']['links']['support']
+
+    @property
+    def repos_url(self) -> str:
+        return self.bot.config['bot']['links']['repos']
+
     def cog_load(self):
         self.log.info('Cog load')
         self.task_presence_cycle.start()
+        self.task_sample_metrics.start()
 
     def cog_unload(self):
         self.log.info('Cog unload')
         self.task_presence_cycle.stop()
+        self.task_sample_metrics.stop()
 
     def format_commit(self, commit: pygit2.Commit) -> str:
         short, _, _ = commit.message.partition('\n')
@@ -102,23 +107,29 @@ class CogGeneral(commands.Cog):
         )
         await ia.response.send_message(embed=embed)
 
-    @commands.slash_command(name='statistics', description='Checks the bot statistics')
-    async def scmd_statistics(self, ia: disnake.AppCmdInter):
+    @commands.slash_command(
+        name='statistics',
+        description='Checks the bot statistics',
+        options=[
+            Option(
+                name='trend',
+                description='Shows feed activity trend over the last day or week instead',
+                type=OptionType.string,
+                required=False,
+                choices=['day', 'week']
+            )
+        ]
+    )
+    async def scmd_statistics(self, ia: disnake.AppCmdInter, trend: str = None):
+        if trend:
+            await self.send_trend(ia, trend)
+            return
+
         uptime_str = uptime_to_str(self.bot.start_time)
-        process = psutil.Process(getpid())
-        cpu_percent = psutil.cpu_percent()
-        ram = psutil.virtual_memory()
-        ram_used = sizeof_fmt(ram.used)
-        ram_total = sizeof_fmt(ram.total)
-        ram_available = sizeof_fmt(ram.available)
-        total_guilds = len(self.bot.guilds)
-        total_users = 0
-        for guild in self.bot.guilds:
-            total_users += guild.member_count
-        total_feed_servers = len(self.bot.feeder.feeders)
-        total_feeders = 0
-        for guild_id in self.bot.feeder.feeders:
-            total_feeders += len(self.bot.feeder.feeders[guild_id])
+        stats = self.bot.stats.snapshot()
+        ram_used = sizeof_fmt(stats.ram_used)
+        ram_total = sizeof_fmt(stats.ram_total)
+        ram_available = sizeof_fmt(stats.ram_available)
 
         embed = disnake.Embed(
             title=':information_source: Bot statistics',
@@ -131,29 +142,48 @@ class CogGeneral(commands.Cog):
         )
         embed.add_field(
             name=':page_facing_up: Process PID',
-            value=process.pid,
+            value=stats.pid,
             inline=True
         )
         embed.add_field(
             name=':control_knobs: System CPU Usage',
-            value=f'{cpu_percent}%',
+            value=f'{stats.cpu_percent}%',
             inline=True
         )
         embed.add_field(
             name=':file_cabinet: Bot RAM Usage',
-            value=sizeof_fmt(process.memory_info().rss),
+            value=sizeof_fmt(stats.process_rss),
             inline=True
         )
         embed.add_field(
             name=':file_cabinet: System Total RAM',
-            value=f'Using: {ram_used} ({ram.percent}%) / {ram_total}\nAvailable: {ram_available} ({ram.available * 100 / ram.total:.1f}%)',
+            value=f'Using: {ram_used} ({stats.ram_percent}%) / {ram_total}\nAvailable: {ram_available} ({stats.ram_available * 100 / stats.ram_total:.1f}%)',
             inline=False
         )
         embed.add_field(
             name=':mailbox: Reddit Feeders',
-            value=f'Feeding {total_feeders} subreddits on {total_feed_servers} servers',
+            value=f'Feeding {stats.feeds} subreddits on {stats.feed_guilds} servers',
+            inline=False
+        )
+        shed = self.bot.feeder.gate.shed
+        embed.add_field(
+            name=':vertical_traffic_light: Delivery Load Shedding',
+            value=(
+                f'{shed["collapsed"]} collapsed, {shed["dropped"]} dropped, {shed["deferred"]} deferred '
+                f'({self.bot.feeder.gate.pending} pending)'
+            ),
             inline=False
         )
+        if self.bot.feeder.http is not None:
+            http_stats = self.bot.feeder.http.stats()
+            embed.add_field(
+                name=':electric_plug: Reddit HTTP Pool',
+                value=(
+                    f'{http_stats["requests"]} requests, {http_stats["connections_created"]} connections opened, '
+                    f'{http_stats["connections_reused"]} reused ({http_stats["reuse_ratio"]:.1%})'
+                ),
+                inline=False
+            )
         embed.add_field(
             name=':signal_strength: Bot latency',
             value=f'{round(self.bot.latency * 1000)}ms',
@@ -161,34 +191,70 @@ class CogGeneral(commands.Cog):
         )
         embed.add_field(
             name=':homes: Servers joined',
-            value=f'{total_guilds} servers',
+            value=f'{stats.guilds} servers',
             inline=True
         )
         embed.add_field(
             name=':busts_in_silhouette: Total users in servers',
-            value=f'{total_users} users',
+            value=f'{stats.users} users',
             inline=True
         )
         await ia.response.send_message(embed=embed)
 
+    async def send_trend(self, ia: disnake.AppCmdInter, period: str):
+        await ia.response.defer()
+        rows = await self.bot.activity.trend(period)
+        top_feeds = await self.bot.activity.top_feeds(period)
+
+        embed = disnake.Embed(
+            title=f':chart_with_upwards_trend: Feed activity over the last {period}',
+            color=disnake.Color.blurple(),
+            description=f'By {"hour" if period == "day" else "day"}, oldest first'
+        )
+        for name, key in (
+            (':eyes: Submissions seen', 'seen'),
+            (':incoming_envelope: Submissions delivered', 'delivered'),
+            (':warning: Send errors', 'errors'),
+            (':satellite: Reddit API calls', 'reddit_calls')
+        ):
+            values = [row[key] for row in rows]
+            embed.add_field(name=name, value=f'`{sparkline(values)}` {sum(values)} total', inline=False)
+
+        p50 = [row['latency_p50'] for row in rows if row['latency_p50'] is not None]
+        p95 = [row['latency_p95'] for row in rows if row['latency_p95'] is not None]
+        p99 = [row['latency_p99'] for row in rows if row['latency_p99'] is not None]
+        embed.add_field(
+            name=':stopwatch: Delivery latency',
+            value=(
+                f'`{sparkline(row["latency_p95"] or 0 for row in rows)}` p95 by bucket\n'
+                f'Median p50: {sorted(p50)[len(p50) // 2]:.1f}s, worst p95: {max(p95):.1f}s, worst p99: {max(p99):.1f}s'
+                if p50 else 'No deliveries'
+            ),
+            inline=False
+        )
+        if top_feeds:
+            embed.add_field(
+                name=':trophy: Busiest feeds',
+                value='\n'.join(
+                    f'`r/{feed["subreddit"]}` in <#{feed["channel_id"]}>: {feed["delivered"]} delivered, '
+                    f'{feed["seen"]} seen, {feed["errors"]} errors'
+                    for feed in top_feeds
+                ),
+                inline=False
+            )
+        await ia.edit_original_response(embed=embed)
+
     @tasks.loop(minutes=1.0)
     async def task_presence_cycle(self):
         await self.bot.wait_until_ready()
 
         game_type, game_name = self.presences[self.presence_iter]
+        stats = self.bot.stats.snapshot()
 
-        total_users = 0
-        for guild in self.bot.guilds:
-            total_users += guild.member_count
-        total_feed_servers = len(self.bot.feeder.feeders)
-        total_feeders = 0
-        for guild_id in self.bot.feeder.feeders:
-            total_feeders += len(self.bot.feeder.feeders[guild_id])
-
-        game_name = game_name.replace('[GUILD_FEEDERS]', str(total_feed_servers))
-        game_name = game_name.replace('[TOTAL_FEEDERS]', str(total_feeders))
-        game_name = game_name.replace('[GUILDS]', str(len(self.bot.guilds)))
-        game_name = game_name.replace('[USERS]', str(total_users))
+        game_name = game_name.replace('[GUILD_FEEDERS]', str(stats.feed_guilds))
+        game_name = game_name.replace('[TOTAL_FEEDERS]', str(stats.feeds))
+        game_name = game_name.replace('[GUILDS]', str(stats.guilds))
+        game_name = game_name.replace('[USERS]', str(stats.users))
 
         await self.bot.change_presence(activity=disnake.Activity(name=game_name, type=game_type))
 
@@ -196,6 +262,10 @@ class CogGeneral(commands.Cog):
         if self.presence_iter >= len(self.presences):
             self.presence_iter = 0
 
+    @tasks.loop(seconds=30.0)
+    async def task_sample_metrics(self):
+        self.bot.stats.sample()
+
 
 def setup(bot: DisredditBot) -> None:
     bot.add_cog(CogGeneral(bot))
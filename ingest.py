@@ -0,0 +1,54 @@
+import logging
+import asyncio
+import signal
+import colorama
+from databases import Database
+
+from bot.utils import Config, LogFormatter
+from bot.utils.ingest import IngestQueue, IngestWorker
+
+# Fix ANSI colors output in Windows terminals
+colorama.just_fix_windows_console()
+
+# Setup logging
+log_handler = logging.StreamHandler()
+log_handler.setFormatter(LogFormatter('%(asctime)s | %(levelname)-8s | %(name)-20s: %(message)s'))
+logging.basicConfig(level=logging.INFO, handlers=[log_handler])
+
+
+async def main() -> None:
+    log = logging.getLogger('Disreddit.Ingest')
+
+    # Load YAML config, the worker reads feeds from the bot database
+    config = Config('config.yml')
+    database = Database('sqlite:///{0}'.format(config['bot']['sqlite-path']), timeout=30.0)
+    queue = IngestQueue(config['runtime']['ingestion']['queue-path'])
+
+    if config['runtime']['ingestion']['mode'] != 'queue':
+        log.warning('"runtime.ingestion.mode" is not "queue", the bot will not read the ingestion queue')
+
+    # Stop on SIGINT/SIGTERM (signal handlers are not available on Windows)
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for name in ('SIGINT', 'SIGTERM'):
+        if hasattr(signal, name):
+            try:
+                loop.add_signal_handler(getattr(signal, name), stop.set)
+            except NotImplementedError:
+                pass
+
+    await database.connect()
+    await queue.connect()
+    log.info(f'Ingesting new submissions to queue {config["runtime"]["ingestion"]["queue-path"]}')
+    try:
+        await IngestWorker(config, database, queue).run(stop)
+    finally:
+        await queue.close()
+        await database.disconnect()
+
+
+if __name__ == '__main__':
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
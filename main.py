@@ -1,9 +1,10 @@
 import logging
-import yaml
+import asyncio
+import signal
 import colorama
 
 from bot import DisredditBot
-from bot.utils import LogFormatter
+from bot.utils import Config, LogFormatter, StartupPipeline, exceptions
 
 # Fix ANSI colors output in Windows terminals
 colorama.just_fix_windows_console()
@@ -14,17 +15,79 @@ log_handler.setFormatter(LogFormatter('%(asctime)s | %(levelname)-8s | %(name)-2
 logging.basicConfig(level=logging.INFO, handlers=[log_handler])
 
 if __name__ == '__main__':
+    startup = StartupPipeline()
+
     # Load YAML config
-    with open('config.yml', 'r') as fp:
-        config = yaml.safe_load(fp)
+    with startup.phase('config'):
+        config = Config('config.yml')
+
+    # Install uvloop event loop policy before the bot creates its loop
+    if config['runtime']['uvloop']:
+        try:
+            import uvloop
+        except ImportError:
+            logging.getLogger('Disreddit').warning('uvloop is not installed, using default event loop')
+        else:
+            asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+            logging.getLogger('Disreddit').info(f'Using uvloop {uvloop.__version__} event loop')
+
+    bot = DisredditBot(config=config, startup=startup)
 
-    bot = DisredditBot(database_path=config['bot']['sqlite-path'])
+    # Reload config on SIGHUP (not available on Windows)
+    def reload_config() -> None:
+        try:
+            config.reload()
+        except exceptions.InvalidConfig as e:
+            logging.getLogger('Disreddit').error(f'Configuration is not reloaded: {e}')
 
-    # Start database connection task
+    if hasattr(signal, 'SIGHUP'):
+        bot.loop.add_signal_handler(signal.SIGHUP, reload_config)
+
+    # Start database connection task, it runs along with Reddit client and gateway startup
     bot.loop.create_task(bot.database_connect())
 
     # Load cogs
     bot.load_extensions('cogs')
 
+    # Close the bot on SIGINT/SIGTERM, so feeds shutdown drains messages being sent
+    # before remaining tasks are cancelled (signal handlers are not available on Windows)
+    loop = bot.loop
+    closing = []
+
+    def close_bot() -> None:
+        if closing:
+            return
+        logging.getLogger('Disreddit').info('Received signal to terminate, closing the bot')
+        closing.append(loop.create_task(bot.close()))
+
+    for name in ('SIGINT', 'SIGTERM'):
+        if hasattr(signal, name):
+            try:
+                loop.add_signal_handler(getattr(signal, name), close_bot)
+            except NotImplementedError:
+                pass
+
+    async def runner() -> None:
+        try:
+            await bot.start(token=config['bot']['token'])
+        finally:
+            if not bot.is_closed():
+                close_bot()
+                await closing[0]
+
     # Run the bot
-    bot.run(token=config['bot']['token'])
+    try:
+        loop.run_until_complete(runner())
+    except KeyboardInterrupt:
+        close_bot()
+    finally:
+        if closing:
+            loop.run_until_complete(asyncio.gather(*closing, return_exceptions=True))
+
+        # Cancel tasks left after the bot is closed
+        tasks = [task for task in asyncio.all_tasks(loop) if not task.done()]
+        for task in tasks:
+            task.cancel()
+        loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+        loop.run_until_complete(loop.shutdown_asyncgens())
+        loop.close()
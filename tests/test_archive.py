@@ -0,0 +1,55 @@
+import asyncio
+from types import SimpleNamespace
+from databases import Database
+
+from bot.bot import MIGRATIONS
+from bot.utils.archive import SubmissionArchive
+from bot.utils.records import SubmissionRecord
+
+CONFIG = {'archive': {'enabled': True, 'flush-interval': 3600.0, 'batch-size': 2, 'max-age': 86400.0, 'max-rows': 100}}
+
+
+def make_record(index: int) -> SubmissionRecord:
+    return SubmissionRecord.from_data({
+        'id': f'post{index}',
+        'subreddit': 'test',
+        'author': f'user{index}',
+        'permalink': f'/r/test/comments/post{index}/',
+        'title': f'Submission #{index}',
+        'selftext': '',
+        'url': f'https://www.reddit.com/r/test/comments/post{index}/',
+        'spoiler': False,
+        'over_18': False,
+        'created_utc': 1700000000.0 + index
+    }, 100)
+
+
+def test_keeps_buffered_submissions_after_failed_write(tmp_path):
+    async def run():
+        database = Database(f'sqlite:///{tmp_path / "bot.sqlite3"}')
+        await database.connect()
+        archive = SubmissionArchive(SimpleNamespace(config=CONFIG, database=database))
+        archive.start()
+
+        # Archive table doesn't exist yet, so writes of full batches fail
+        buffered = []
+        for index in range(1, 4):
+            archive.add(make_record(index), 10, 1)
+            await asyncio.sleep(0.1)
+            buffered.append(len(archive._buffer))
+
+        # Migration 5 creates archive tables
+        for statement in MIGRATIONS[4]:
+            await database.execute(statement)
+        archive.add(make_record(4), 10, 1)
+        await asyncio.sleep(0.1)
+        await archive.close()
+
+        rows = await database.fetch_all('SELECT submission_id FROM archive ORDER BY id')
+        await database.disconnect()
+        return buffered, [row['submission_id'] for row in rows]
+
+    buffered, archived = asyncio.run(run())
+
+    assert buffered == [1, 2, 2]
+    assert archived == ['post2', 'post3', 'post4']
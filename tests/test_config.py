@@ -0,0 +1,31 @@
+import pytest
+
+from bot.utils import exceptions
+from bot.utils.config import DEFAULTS, RESTART_KEYS, Config, _merge
+
+
+def make_data(**feeds) -> dict:
+    return _merge(DEFAULTS, {
+        'bot': {'token': 'token', 'sqlite-path': 'bot.sqlite3'},
+        'reddit': {'user-agent': 'disreddit tests', 'client-id': 'id', 'client-secret': 'secret'},
+        'feeds': feeds
+    })
+
+
+@pytest.mark.parametrize('key', ['retry-delay', 'poll-max-delay', 'ranked-poll-interval'])
+def test_poll_delays_must_be_positive(key):
+    with pytest.raises(exceptions.InvalidConfig):
+        Config.validate(make_data(**{key: 0}))
+
+
+@pytest.mark.parametrize('key', ['catch-up', 'shutdown-timeout'])
+def test_catch_up_and_shutdown_timeout_may_be_zero(key):
+    Config.validate(make_data(**{key: 0}))
+
+    with pytest.raises(exceptions.InvalidConfig):
+        Config.validate(make_data(**{key: -1}))
+
+
+def test_delivery_concurrency_requires_restart():
+    assert 'delivery.concurrency'.startswith(RESTART_KEYS)
+    assert not 'delivery.channel-rate'.startswith(RESTART_KEYS)
@@ -0,0 +1,169 @@
+import asyncio
+from types import SimpleNamespace
+import pytest
+
+from bot.utils import delivery
+from bot.utils.delivery import DeliveryGate
+
+CHANNEL = SimpleNamespace(id=10, guild=SimpleNamespace(id=1))
+
+
+def make_record(index: int) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=f'post{index}',
+        subreddit='test',
+        title=f'Submission #{index}',
+        permalink=f'/r/test/comments/post{index}/'
+    )
+
+
+class Feeder:
+    """Feeder side of delivery gate which records sent messages and handled submissions."""
+
+    def __init__(self, **settings):
+        self.config = {
+            'delivery': {'channel-rate': 2, 'guild-rate': 0, 'policy': 'defer', 'max-pending': 50, **settings}
+        }
+        self.sent = []
+        self.handled_ids = []
+        self.deliverable = True
+        self.channels = self
+
+    def get(self, channel_id: int) -> SimpleNamespace:
+        return SimpleNamespace(channel=CHANNEL, deliverable=self.deliverable)
+
+    def schedule(self, channel, message, records=()) -> None:
+        self.sent.append((channel.id, [record.id for record in records], message))
+        self.handled(channel.id, records)
+
+    async def deliver(self, channel, message, records=()) -> bool:
+        self.schedule(channel, message, records)
+        return True
+
+    def handled(self, channel_id, records) -> None:
+        self.handled_ids.extend(record.id for record in records)
+
+
+@pytest.fixture(autouse=True)
+def short_window(monkeypatch):
+    monkeypatch.setattr(delivery, 'WINDOW', 0.2)
+
+
+async def submit_all(gate: DeliveryGate, count: int) -> None:
+    for index in range(count):
+        await gate.submit(CHANNEL, make_record(index), {'content': f'post{index}'})
+
+
+async def wait_flushed(gate: DeliveryGate) -> None:
+    for _ in range(100):
+        if not gate.pending:
+            return
+        await asyncio.sleep(0.05)
+
+
+def test_gate_holds_over_cap_and_releases_in_window():
+    feeder = Feeder(policy='defer')
+    gate = DeliveryGate(feeder)
+
+    async def run():
+        await submit_all(gate, 5)
+        held = gate.pending
+        sent = [ids for _, ids, _ in feeder.sent]
+        await wait_flushed(gate)
+        return held, sent
+
+    held, sent_before = asyncio.run(run())
+
+    assert held == 3
+    assert sent_before == [['post0'], ['post1']]
+    assert [ids for _, ids, _ in feeder.sent] == [['post0'], ['post1'], ['post2'], ['post3'], ['post4']]
+    assert gate.shed['deferred'] == 3
+    assert feeder.handled_ids == ['post0', 'post1', 'post2', 'post3', 'post4']
+
+
+def test_gate_collapses_held_into_summary():
+    feeder = Feeder(policy='summary')
+    gate = DeliveryGate(feeder)
+
+    async def run():
+        await submit_all(gate, 5)
+        await wait_flushed(gate)
+
+    asyncio.run(run())
+
+    assert [ids for _, ids, _ in feeder.sent] == [['post0'], ['post1'], ['post2', 'post3', 'post4']]
+    assert feeder.sent[-1][2]['content'].startswith('*Collapsed 3 submissions')
+    assert gate.shed['collapsed'] == 3
+
+
+def test_gate_drops_oldest_held_when_full():
+    feeder = Feeder(policy='drop-oldest', **{'max-pending': 2})
+    gate = DeliveryGate(feeder)
+
+    async def run():
+        await submit_all(gate, 5)
+        # Dropped submission is handled at once, so it doesn't hold back the feed checkpoint
+        handled = list(feeder.handled_ids)
+        await wait_flushed(gate)
+        return handled
+
+    handled = asyncio.run(run())
+
+    assert handled == ['post0', 'post1', 'post2']
+    assert [ids for _, ids, _ in feeder.sent] == [['post0'], ['post1'], ['post3'], ['post4']]
+    assert gate.shed['dropped'] == 1
+
+
+def test_gate_stop_schedules_held_at_once():
+    feeder = Feeder(policy='defer')
+    gate = DeliveryGate(feeder)
+
+    async def run():
+        await submit_all(gate, 5)
+        return gate.stop()
+
+    scheduled = asyncio.run(run())
+
+    assert scheduled == 3
+    assert gate.pending == 0
+    assert [ids for _, ids, _ in feeder.sent] == [['post0'], ['post1'], ['post2', 'post3', 'post4']]
+    assert feeder.handled_ids == ['post0', 'post1', 'post2', 'post3', 'post4']
+
+
+def test_gate_stop_leaves_held_of_undeliverable_channel():
+    feeder = Feeder(policy='defer')
+    gate = DeliveryGate(feeder)
+
+    async def run():
+        await submit_all(gate, 5)
+        feeder.deliverable = False
+        return gate.stop()
+
+    scheduled = asyncio.run(run())
+
+    assert scheduled == 0
+    assert gate.pending == 0
+    assert feeder.handled_ids == ['post0', 'post1']
+
+
+def test_gate_drops_idle_windows():
+    feeder = Feeder(policy='defer', **{'channel-rate': 1, 'guild-rate': 10})
+    gate = DeliveryGate(feeder)
+
+    async def run():
+        for channel_id in range(11, 21):
+            channel = SimpleNamespace(id=channel_id, guild=SimpleNamespace(id=channel_id))
+            await gate.submit(channel, make_record(channel_id), {'content': f'post{channel_id}'})
+        await submit_all(gate, 5)
+        await asyncio.sleep(0.25)
+
+        # Windows of idle channels and guilds are dropped, channel with held submissions keeps its window
+        await gate.submit(SimpleNamespace(id=30, guild=SimpleNamespace(id=30)), make_record(30), {'content': 'post30'})
+        windows = set(gate._channel_windows), set(gate._guild_windows)
+        gate.stop()
+        return windows
+
+    channel_windows, guild_windows = asyncio.run(run())
+
+    assert channel_windows == {10, 30}
+    assert guild_windows <= {1, 30}
@@ -0,0 +1,95 @@
+import random
+import pytest
+
+from bot.utils.formatting import CONTENT_LIMIT, FOOTER_LIMIT, TRUNCATION_MARK, fit_content, format_selftext
+
+PIECES = ('word ', 'long-word ', '\n\n', '&#x200B;', '>!', '!<', '<', '>', '**', '*', '__', '_', '~~', '||', '`', '```', '\\')
+
+
+def random_text(seed: int, count: int) -> str:
+    rng = random.Random(seed)
+    return ''.join(rng.choice(PIECES) for _ in range(count))
+
+
+def without_mark(text: str) -> str:
+    assert text.endswith(TRUNCATION_MARK)
+    return text[:-len(TRUNCATION_MARK)]
+
+
+@pytest.mark.parametrize('seed', range(50))
+@pytest.mark.parametrize('spoiler', [False, True])
+def test_selftext_fits_max_length(seed, spoiler):
+    text = random_text(seed, 3000)
+    for text_limit, max_length in ((1000, CONTENT_LIMIT), (4000, 1500), (100, 60)):
+        assert len(format_selftext(text, text_limit, max_length, spoiler=spoiler)) <= max_length
+
+
+@pytest.mark.parametrize('seed', range(20))
+@pytest.mark.parametrize('limit', [CONTENT_LIMIT, FOOTER_LIMIT])
+def test_content_fits_limit(seed, limit):
+    content = random_text(seed, 5000)
+
+    assert len(fit_content(content, limit)) <= limit
+    assert fit_content(content[:limit], limit) == content[:limit]
+
+
+def test_closes_spoiler_on_truncation():
+    result = without_mark(format_selftext('>!' + 'secret ' * 1000 + '!<', 200, CONTENT_LIMIT))
+
+    assert result.startswith('||secret')
+    assert result.endswith('||')
+    assert result.count('||') == 2
+
+
+def test_spoiler_submission_is_wrapped_once():
+    result = format_selftext('>!inner!< ' * 500, 200, CONTENT_LIMIT, spoiler=True)
+
+    assert result.startswith('||') and result.endswith('||')
+    assert result.count('||') == 2
+
+
+def test_closes_code_fence_on_truncation():
+    result = without_mark(format_selftext('**bold** ```\n' + 'code *not italic* ' * 100, 300, CONTENT_LIMIT))
+
+    assert result.endswith('\n```')
+    assert result.count('```') == 2
+
+
+@pytest.mark.parametrize('text, closing', [
+    ('*' + 'italic ' * 200, '*'),
+    ('_' + 'italic ' * 200, '_'),
+    ('__' + 'underline ' * 200, '__'),
+    ('~~' + 'strike ' * 200, '~~'),
+    ('**bold *both ' + 'word ' * 200, '***')
+])
+def test_closes_emphasis_on_truncation(text, closing):
+    assert without_mark(format_selftext(text, 100, CONTENT_LIMIT)).endswith(closing)
+
+
+def test_keeps_underscores_inside_words():
+    result = without_mark(format_selftext('snake_case_name ' * 100, 100, CONTENT_LIMIT))
+
+    assert result.endswith('snake_case_name')
+
+
+def test_doesnt_cut_escape_sequence():
+    for prefix in ('', 'a', 'ab'):
+        result = without_mark(format_selftext(prefix + '<' * 500, 100, CONTENT_LIMIT))
+        # Every backslash escapes the following character, none escapes the truncation mark
+        assert result.replace('\\<', '') == prefix
+
+
+def test_drops_dangling_backslash():
+    result = without_mark(format_selftext('word ' + '\\' * 301, 100, CONTENT_LIMIT))
+
+    assert (len(result) - len(result.rstrip('\\'))) % 2 == 0
+
+
+@pytest.mark.parametrize('text', ['&#x200B;', '&#x200B;' * 1000, '&#x200B;\n\n&#x200B; \n'])
+def test_zero_width_only_is_empty(text):
+    assert format_selftext(text, 100, CONTENT_LIMIT) == ''
+    assert format_selftext(text, 100, CONTENT_LIMIT, spoiler=True) == ''
+
+
+def test_short_text_is_not_truncated():
+    assert format_selftext('Hello >!world!< <3', 100, CONTENT_LIMIT) == 'Hello ||world|| \\<3'
@@ -0,0 +1,123 @@
+import asyncio
+
+from bot.utils.ingest import IngestConsumer, IngestQueue
+from bot.utils.records import SubmissionRecord
+
+CONFIG = {
+    'runtime': {'ingestion': {'batch-size': 100, 'poll-interval': 0.01}},
+    'feeds': {'catch-up': 3600.0}
+}
+
+
+def make_record(index: int) -> SubmissionRecord:
+    return SubmissionRecord.from_data({
+        'id': f'post{index}',
+        'subreddit': 'test',
+        'author': f'user{index}',
+        'permalink': f'/r/test/comments/post{index}/',
+        'title': f'Submission #{index}',
+        'selftext': '',
+        'url': f'https://www.reddit.com/r/test/comments/post{index}/',
+        'spoiler': False,
+        'over_18': False,
+        'created_utc': 1700000000.0 + index
+    }, 100)
+
+
+async def start_consumer(path, count: int) -> IngestConsumer:
+    queue = IngestQueue(str(path))
+    await queue.connect()
+    await queue.put('test', [make_record(index) for index in range(1, count + 1)])
+    return IngestConsumer(CONFIG, queue)
+
+
+async def receive(subscription, count: int) -> list:
+    return [(await asyncio.wait_for(subscription.queue.get(), 1.0))[0] for _ in range(count)]
+
+
+def test_acks_records_handled_out_of_order(tmp_path):
+    async def run():
+        consumer = await start_consumer(tmp_path / 'queue.sqlite3', 3)
+        subscription = consumer.subscribe('test', 10)
+        await consumer.start()
+        row_ids = await receive(subscription, 3)
+
+        acked = []
+        for row_id in (row_ids[2], row_ids[0], row_ids[1]):
+            subscription.done(row_id)
+            await consumer.ack()
+            acked.append(consumer.acked_id)
+
+        left = await consumer.queue.fetch(0, 100)
+        await consumer.close()
+        return row_ids, acked, left
+
+    row_ids, acked, left = asyncio.run(run())
+
+    assert acked == [0, row_ids[0], row_ids[2]]
+    assert left == []
+
+
+def test_keeps_records_of_stopped_feed_until_it_subscribes_again(tmp_path):
+    async def run():
+        consumer = await start_consumer(tmp_path / 'queue.sqlite3', 3)
+        subscription = consumer.subscribe('test', 10)
+        await consumer.start()
+        row_ids = await receive(subscription, 3)
+        subscription.done(row_ids[0])
+
+        # Feed is stopped by cog reload, records put by worker meanwhile are kept too
+        consumer.unsubscribe('test', subscription)
+        worker_queue = IngestQueue(str(tmp_path / 'queue.sqlite3'))
+        await worker_queue.connect()
+        await worker_queue.put('test', [make_record(4)])
+        await worker_queue.close()
+        await asyncio.sleep(0.1)
+        acked_stopped = consumer.acked_id
+
+        subscription = consumer.subscribe('test', 10)
+        replayed = await receive(subscription, 3)
+        await consumer.close()
+        return row_ids, acked_stopped, replayed
+
+    row_ids, acked_stopped, replayed = asyncio.run(run())
+
+    assert acked_stopped == row_ids[0]
+    assert replayed == [row_ids[1], row_ids[2], row_ids[2] + 1]
+
+
+def test_acks_records_of_unsubscribed_feed(tmp_path):
+    async def run():
+        consumer = await start_consumer(tmp_path / 'queue.sqlite3', 2)
+        subscription = consumer.subscribe('test', 10)
+        await consumer.start()
+        row_ids = await receive(subscription, 2)
+
+        consumer.unsubscribe('test', subscription, keep=False)
+        await consumer.ack()
+        acked = consumer.acked_id
+        await consumer.close()
+        return row_ids, acked
+
+    row_ids, acked = asyncio.run(run())
+
+    assert acked == row_ids[1]
+
+
+def test_holds_records_of_feed_failed_to_start(tmp_path):
+    async def run():
+        consumer = await start_consumer(tmp_path / 'queue.sqlite3', 2)
+        consumer.hold('Test', 10)
+        await consumer.start()
+        await asyncio.sleep(0.1)
+        acked = consumer.acked_id
+
+        subscription = consumer.subscribe('test', 10)
+        replayed = await receive(subscription, 2)
+        await consumer.close()
+        return acked, replayed
+
+    acked, replayed = asyncio.run(run())
+
+    assert acked == 0
+    assert len(replayed) == 2
@@ -0,0 +1,96 @@
+import asyncio
+import pytest
+import asyncpraw
+from asyncpraw.models.util import stream_generator
+
+from bot.utils.listing import ListingPoller
+from bot.utils.records import SubmissionRecord
+
+TEXT_LIMIT = 100
+
+
+def submission(index: int) -> dict:
+    return {
+        'kind': 't3',
+        'data': {
+            'id': f'post{index}',
+            'name': f't3_post{index}',
+            'subreddit': 'test',
+            'author': f'user{index}',
+            'permalink': f'/r/test/comments/post{index}/title/',
+            'title': f'Submission #{index}',
+            'link_flair_text': None,
+            'selftext': 'text ' * index,
+            'url': f'https://www.reddit.com/r/test/comments/post{index}/title/',
+            'spoiler': False,
+            'over_18': False,
+            'created_utc': 1700000000.0 + index
+        }
+    }
+
+
+class FakeListing:
+    """Subreddit new listing which answers like Reddit to ``limit`` and ``before`` parameters."""
+
+    def __init__(self, count: int):
+        self.count = 0
+        self.publish(count)
+
+    def publish(self, count: int) -> None:
+        self.count += count
+
+    def page(self, params: dict) -> dict:
+        # Newest first, only submissions newer than "before" if it's given
+        children = [submission(index) for index in range(self.count, 0, -1)]
+        before = params.get('before')
+        if before is not None:
+            fullnames = [child['data']['name'] for child in children]
+            children = children[:fullnames.index(before)]
+        return {'kind': 'Listing', 'data': {'children': children[:params['limit']]}}
+
+    async def request(self, method: str, path: str, params: dict) -> dict:
+        return self.page(params)
+
+
+async def poll_both(skip_existing: bool, batches: list) -> tuple:
+    """Polls listing with ListingPoller and asyncpraw stream after every published batch."""
+    listing = FakeListing(batches[0])
+    reddit = asyncpraw.Reddit(client_id='test', client_secret='test', user_agent='disreddit tests')
+
+    async def new(limit: int, params: dict):
+        for sm in reddit._objector.objectify(data=listing.page({**params, 'limit': limit})):
+            yield sm
+
+    poller = ListingPoller(listing, 'test', lambda: TEXT_LIMIT, skip_existing=skip_existing)
+    stream = stream_generator(new, pause_after=-1, skip_existing=skip_existing)
+
+    polled, streamed = [], []
+    try:
+        for count in batches:
+            if polled:
+                listing.publish(count)
+            polled.append([record.to_dict() for record in await poller.poll()])
+
+            records = []
+            async for sm in stream:
+                if sm is None:
+                    break
+                records.append(SubmissionRecord.from_submission(sm, TEXT_LIMIT).to_dict())
+            streamed.append(records)
+    finally:
+        await reddit.close()
+    return polled, streamed
+
+
+@pytest.mark.parametrize('skip_existing', [True, False])
+def test_poller_yields_as_stream(skip_existing):
+    polled, streamed = asyncio.run(poll_both(skip_existing, [5, 3, 0, 2, 0]))
+
+    assert polled == streamed
+    assert [len(records) for records in polled] == [0 if skip_existing else 5, 3, 0, 2, 0]
+
+
+def test_poller_yields_oldest_first():
+    polled, _ = asyncio.run(poll_both(False, [3, 2]))
+
+    assert [record['id'] for records in polled for record in records] == ['post1', 'post2', 'post3', 'post4', 'post5']
@@ -0,0 +1,102 @@
+import asyncio
+from types import SimpleNamespace
+from databases import Database
+
+from bot.bot import MIGRATIONS
+from bot.utils.progress import CheckpointStore, FeedProgress
+
+
+def track(progress: FeedProgress, count: int, callback=None) -> None:
+    for index in range(1, count + 1):
+        progress.track(SimpleNamespace(id=f'post{index}', created_utc=100.0 + index), callback)
+
+
+def test_checkpoint_waits_for_oldest_outstanding():
+    progress = FeedProgress(50.0)
+    track(progress, 3)
+
+    assert not progress.done('post2')
+    assert progress.checkpoint == 50.0
+
+    assert progress.done('post1')
+    assert progress.checkpoint == 102.0
+    assert len(progress) == 1
+
+
+def test_checkpoint_ignores_unknown_and_repeated():
+    progress = FeedProgress(50.0)
+    track(progress, 1)
+
+    assert progress.done('post1')
+    assert not progress.done('post1')
+    assert not progress.done('post9')
+    assert progress.checkpoint == 101.0
+
+
+def test_callback_runs_when_handled():
+    progress = FeedProgress()
+    handled = []
+    progress.track(SimpleNamespace(id='post1', created_utc=1.0), lambda: handled.append('post1'))
+    progress.track(SimpleNamespace(id='post2', created_utc=2.0), lambda: handled.append('post2'))
+
+    progress.done('post2')
+
+    assert handled == ['post2']
+    assert progress.checkpoint == 0.0
+
+
+async def connect(path) -> Database:
+    database = Database(f'sqlite:///{path}')
+    await database.connect()
+    # Migration 2 creates checkpoints table
+    for statement in MIGRATIONS[1]:
+        await database.execute(statement)
+    return database
+
+
+def make_store(database: Database) -> CheckpointStore:
+    return CheckpointStore(SimpleNamespace(config={'feeds': {'checkpoint-interval': 0.05}}, database=database))
+
+
+def test_restores_checkpoint_written_mid_run(tmp_path):
+    async def run():
+        database = await connect(tmp_path / 'bot.sqlite3')
+        store = make_store(database)
+        store.start()
+        store[(10, 'test')] = 100.0
+        await asyncio.sleep(0.2)
+
+        # Crash after the periodic write: newer checkpoint is lost, the written one is restored
+        store[(10, 'test')] = 200.0
+        store._task.cancel()
+        await database.disconnect()
+
+        database = await connect(tmp_path / 'bot.sqlite3')
+        restored = await make_store(database).load()
+        await database.disconnect()
+        return restored
+
+    assert asyncio.run(run()) == {(10, 'test'): 100.0}
+
+
+def test_writes_only_changed_and_deletes_stopped(tmp_path):
+    async def run():
+        database = await connect(tmp_path / 'bot.sqlite3')
+        store = make_store(database)
+        store[(10, 'test')] = 100.0
+        store[(20, 'test')] = 100.0
+        written = [await store.flush()]
+
+        store[(10, 'test')] = 150.0
+        store.pop((20, 'test'))
+        written.append(await store.flush())
+        written.append(await store.flush())
+
+        restored = await store.load()
+        await database.disconnect()
+        return written, restored
+
+    written, restored = asyncio.run(run())
+
+    assert written == [2, 1, 0]
+    assert restored == {(10, 'test'): 150.0}
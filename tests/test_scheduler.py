@@ -0,0 +1,74 @@
+import asyncio
+import pytest
+
+from bot.utils.delivery import FairScheduler
+
+
+async def run_scheduler(scheduler: FairScheduler, sends: list) -> list:
+    order = []
+
+    async def send(guild_id: int):
+        order.append(guild_id)
+        await asyncio.sleep(0)
+
+    futures = [scheduler.submit(guild_id, lambda guild_id=guild_id: send(guild_id)) for guild_id in sends]
+    await asyncio.gather(*futures)
+    scheduler.stop()
+    return order
+
+
+def test_scheduler_shares_turns_by_weight():
+    weights = {1: 1, 2: 2, 3: 1}
+    scheduler = FairScheduler(1, weights.get)
+
+    order = asyncio.run(run_scheduler(scheduler, [1] * 6 + [2] * 6 + [3] * 6))
+
+    assert order[:12] == [1, 2, 2, 3, 1, 2, 2, 3, 1, 2, 2, 3]
+    assert order[12:] == [1, 3, 1, 3, 1, 3]
+
+
+def test_scheduler_doesnt_delay_quiet_guild_behind_busy_one():
+    scheduler = FairScheduler(1, lambda guild_id: 1)
+
+    order = asyncio.run(run_scheduler(scheduler, [1] * 20 + [2]))
+
+    assert order.index(2) == 1
+
+
+def test_scheduler_stop_cancels_pending_sends():
+    scheduler = FairScheduler(1, lambda guild_id: 1)
+
+    async def run():
+        started = asyncio.Event()
+
+        async def send():
+            started.set()
+            await asyncio.sleep(10)
+
+        futures = [scheduler.submit(1, send) for _ in range(3)]
+        await started.wait()
+        cancelled = scheduler.stop()
+        await asyncio.sleep(0)
+        return cancelled, futures
+
+    cancelled, futures = asyncio.run(run())
+
+    # The send in progress is cancelled with its worker, the rest are cancelled pending
+    assert cancelled == 2
+    assert all(future.cancelled() for future in futures)
+    assert scheduler.pending == {}
+
+
+def test_scheduler_sets_send_exception():
+    scheduler = FairScheduler(2, lambda guild_id: 1)
+
+    async def run():
+        async def send():
+            raise RuntimeError('Missing Permissions')
+
+        future = scheduler.submit(1, send)
+        with pytest.raises(RuntimeError):
+            await future
+        scheduler.stop()
+
+    asyncio.run(run())
@@ -0,0 +1,118 @@
+import asyncio
+from types import SimpleNamespace
+from typing import Dict, List
+
+from bot.utils.snapshot import ListingWatcher
+
+
+def submission(index: int, score: int) -> dict:
+    return {
+        'id': f'post{index}',
+        'name': f't3_post{index}',
+        'subreddit': 'test',
+        'author': f'user{index}',
+        'permalink': f'/r/test/comments/post{index}/',
+        'title': f'Submission #{index}',
+        'selftext': '',
+        'url': f'https://www.reddit.com/r/test/comments/post{index}/',
+        'spoiler': False,
+        'over_18': False,
+        'score': score,
+        'created_utc': 1700000000.0 + index
+    }
+
+
+class FakeWatcher(ListingWatcher):
+    """Listing watcher which fetches listing set by test and is polled by test only."""
+
+    def __init__(self):
+        super().__init__(SimpleNamespace(text_limit=100), 'test', 'hot')
+        self.listing: List[dict] = []
+
+    def publish(self, scores: Dict[int, int]) -> None:
+        """Sets listing of submissions by index, ranked in the given order."""
+        self.listing = [submission(index, score) for index, score in scores.items()]
+
+    async def fetch(self) -> List[dict]:
+        return self.listing
+
+    async def _run(self) -> None:
+        pass
+
+
+def emitted(subscription) -> List[str]:
+    ids = []
+    while not subscription.queue.empty():
+        ids.append(subscription.queue.get_nowait().id)
+    return ids
+
+
+def test_first_snapshot_is_baseline():
+    async def run():
+        watcher = FakeWatcher()
+        subscription = watcher.subscribe(max_rank=10, min_score=0)
+        watcher.publish({1: 10, 2: 5})
+        await watcher.poll()
+        first = emitted(subscription)
+
+        # Subscription made after the first poll is seeded from the current snapshot
+        late = watcher.subscribe(max_rank=10, min_score=0)
+        await watcher.poll()
+        return first, emitted(subscription), emitted(late)
+
+    assert asyncio.run(run()) == ([], [], [])
+
+
+def test_emits_entries_newly_crossing_thresholds():
+    async def run():
+        watcher = FakeWatcher()
+        subscription = watcher.subscribe(max_rank=2, min_score=10)
+        watcher.publish({1: 20, 2: 5, 3: 50})
+        await watcher.poll()
+
+        # post2 crosses min score, post3 rises into max rank pushing post1 out
+        watcher.publish({3: 50, 2: 15, 1: 20})
+        await watcher.poll()
+        crossed = emitted(subscription)
+
+        # Changed score of entry already over thresholds isn't emitted again
+        watcher.publish({3: 80, 2: 30, 1: 20})
+        await watcher.poll()
+        return crossed, emitted(subscription)
+
+    assert asyncio.run(run()) == (['post3', 'post2'], [])
+
+
+def test_doesnt_emit_entry_coming_back_again():
+    async def run():
+        watcher = FakeWatcher()
+        subscription = watcher.subscribe(max_rank=1, min_score=0)
+        watcher.publish({1: 10})
+        await watcher.poll()
+
+        results = []
+        for scores in ({2: 20, 1: 10}, {1: 30, 2: 20}, {2: 40, 1: 30}, {1: 50}):
+            watcher.publish(scores)
+            await watcher.poll()
+            results.append(emitted(subscription))
+        return results
+
+    assert asyncio.run(run()) == [['post2'], [], [], []]
+
+
+def test_subscriptions_share_watcher_with_own_thresholds():
+    async def run():
+        watcher = FakeWatcher()
+        top = watcher.subscribe(max_rank=1, min_score=0)
+        scored = watcher.subscribe(max_rank=10, min_score=100)
+        watcher.publish({1: 10, 2: 5})
+        await watcher.poll()
+
+        watcher.publish({2: 150, 1: 10, 3: 120})
+        await watcher.poll()
+        results = (emitted(top), emitted(scored))
+
+        stopped = watcher.unsubscribe(top), watcher.unsubscribe(scored)
+        return results, stopped
+
+    assert asyncio.run(run()) == ((['post2'], ['post2', 'post3']), (False, True))